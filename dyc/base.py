@@ -1,37 +1,139 @@
 """
 Base file that contains the core classes that are used in dyc.
 """
+import os
 import fileinput
-from .utils import all_files_generator, get_file_lines, is_one_line_method, is_comment
+import tokenize
+import click
+from .utils import (
+    get_file_lines,
+    is_one_line_method,
+    is_comment,
+    LineIndex,
+)
+from .engines import get_engine, RegexEngine
+from .configs.spec import compile_formats
+from .walker import FileWalker, GlobMatcher
+
+
+class SourceFile(object):
+    """
+    In-memory buffer of a file. The file is read once when the
+    buffer is created. Builders queue insertions against the original
+    text and all of them are spliced in and written back once with `write`
+    """
+
+    def __init__(self, filename, engine=None, budget=None):
+        self.filename = filename
+        with open(filename, "r") as stream:
+            self.text = stream.read()
+        self.edits = []
+        self.engine = engine
+        self.budget = budget
+        self._lines = None
+        self._scanner = None
+
+    @property
+    def lines(self):
+        """
+        Line-start index of the original text, built on first use and
+        shared by every builder working on this file
+        """
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        return self._lines
+
+    @property
+    def scanner(self):
+        """
+        Detection engine of the file, it scans the original text once
+        and is shared by every builder. Falls back to the regex engine
+        when the file cannot be tokenized
+        """
+        if self._scanner is None:
+            try:
+                self._scanner = get_engine(self.engine)(self)
+            except (SyntaxError, tokenize.TokenError) as e:
+                click.echo(
+                    click.style(
+                        "Error %r: USING regex engine for %s" % (e, self.filename),
+                        fg="red",
+                    ),
+                    err=True,
+                )
+                self._scanner = RegexEngine(self)
+        return self._scanner
+
+    @property
+    def changed(self):
+        """
+        Property that tells if there are pending insertions on the buffer
+        """
+        return bool(self.edits)
+
+    def insert(self, offset, text):
+        """
+        Queues a text to be inserted at an offset of the original text.
+        Insertions sharing an offset keep the order they were queued in
+        Parameters
+        ----------
+        int offset: Index in the original text
+        str text: Text to insert
+        """
+        self.edits.append((offset, len(self.edits), text))
+
+    def render(self):
+        """
+        Builds the final text in one pass, joining the slices of the
+        original text with the queued insertions sorted by offset
+        """
+        if not self.edits:
+            return self.text
+        chunks = []
+        last = 0
+        for offset, _, text in sorted(self.edits):
+            chunks.append(self.text[last:offset])
+            chunks.append(text)
+            last = offset
+        chunks.append(self.text[last:])
+        return "".join(chunks)
+
+    def write(self):
+        """
+        Writes the buffer back to the file, only when something changed
+        """
+        if not self.changed:
+            return False
+        self.text = self.render()
+        self.edits = []
+        self._lines = None
+        self._scanner = None
+        with open(self.filename, "w") as stream:
+            stream.write(self.text)
+        return True
 
 
 class Builder(object):
-    def __init__(self, filename, config, placeholders=False):
+    def __init__(self, filename, config, placeholders=False, source=None):
         self.filename = filename
         self.config = config
         self.placeholders = placeholders
+        self.source = source if source is not None else SourceFile(filename)
 
     details = dict()
 
-    def _is_line_part_of_patches(self, lineno, line, patches):
+    def _is_line_part_of_patches(self, first, last, patches):
         """
-        Checks if a line is part of the patch
+        Checks if any line of a candidate was added by the patch
         Parameters
         ----------
-        int lineno: Line number
-        str line: Line text in a patch
-        list patches: List of patches
-        """
-        result = False
-        for change in patches:
-            start, end = change.get("hunk")
-            if start <= lineno <= end:
-                patch = change.get("patch")
-                found = line in patch
-                if found:
-                    result = True
-                    break
-        return result
+        int first: First line number of the candidate
+        int last: Last line number of the candidate
+        HunkIndex patches: Index of the lines added in the file
+        """
+        if not patches:
+            return False
+        return patches.overlaps(first, last)
 
     def clear(self, filename):
         """
@@ -43,6 +145,15 @@ class Builder(object):
             # Probably the filename is not already there
             return
 
+    def candidates(self, change=None):
+        """
+        Abstract method that yields the undocumented candidates of the file
+        Parameters
+        ----------
+        dict change: Change of the file from a diff, if any
+        """
+        return iter(())
+
     def prompts(self):
         """
         Abstract method to get inputs from user
@@ -51,7 +162,7 @@ class Builder(object):
 
     def apply(self):
         """
-        Abstract method to changes on the file
+        Abstract method to apply changes on the source buffer
         """
         pass
 
@@ -68,43 +179,49 @@ class FilesDirector:
         ----------
         list files: list of pre-given files
         """
-        self.set_files_to_read(files=files)
+        self.walker = FileWalker(
+            os.getcwd(),
+            extensions=self.extensions,
+            max_size=self.config.get("max_file_size"),
+            discovery=self.config.get("discovery") or "walk",
+            submodules=self.config.get("submodules"),
+        )
         self.apply_includes()
         self.apply_excludes()
+        self.set_files_to_read(files=files)
 
     def apply_includes(self):
         """
-        TODO function that applies includes config
+        Only files matching one of the `include` globs are read. All of
+        them are when there are none
         """
-        pass
+        self.walker.include = GlobMatcher(self.config.get("include"))
 
     def apply_excludes(self):
         """
-        TODO Method for removing files from a file list
+        Files and directories matching one of the `exclude` globs are
+        left out. Excluded directories are not walked into
         """
-        pass
+        self.walker.exclude = GlobMatcher(self.config.get("exclude"))
 
     def set_files_to_read(self, files=[]):
         """
-        Sets files that we will loop over in file_list property
+        Sets files that we will loop over in file_list property. Files
+        are yielded lazily, as they are found or accepted
         Parameters
         ----------
         list files: Pre-given files list
         """
         if self.config.get("file_list"):
             # File list has already been passed
-            self.file_list = self.config.get("file_list")
+            self.file_list = self.walker.filter(self.config.get("file_list"))
             return
 
         if len(files):
-            self.file_list = files
+            self.file_list = self.walker.filter(files)
             return
 
-        result = []
-        for paths in all_files_generator(extensions=self.extensions):
-            result += paths
-
-        self.file_list = result
+        self.file_list = self.walker.files()
 
 
 class FormatsDirector:
@@ -113,9 +230,11 @@ class FormatsDirector:
 
     def prepare_formats(self):
         """
-        Function that prepares allowed formats
+        Function that prepares allowed formats. Formats compiled by
+        ParsedConfig are reused, otherwise they are compiled here
         """
-        self.formats = {ext.get("extension"): ext for ext in self.config.get("formats")}
+        if not self.formats:
+            self.formats = compile_formats(self.config.get("formats"))
 
 
 class Processor(FilesDirector, FormatsDirector):
@@ -0,0 +1,268 @@
+"""
+On-disk cache of the detection results. Every scanned file is stored
+with its size, mtime and content hash, so that an unchanged file is
+answered from the cache without being read. The whole cache is tied to
+a hash of the effective configuration and is dropped as soon as
+`dyc.yaml` or `defaults.yaml` resolve to something else.
+"""
+import os
+import json
+import time
+import hashlib
+
+CACHE_VERSION = 1  # Bump when the stored findings change shape
+CACHE_FILE = "scan.json"
+CONFIG_DIRECTORY = ".dyc-cache"  # Known before dyc.yaml is read
+CONFIG_FILE = "config.json"
+RACY_SECONDS = 2  # Files modified more recently are always hashed
+
+
+def config_hash(config):
+    """
+    Hashes the effective configuration of a run. The list of files
+    to document is left out as it does not change detection results
+    Parameters
+    ----------
+    dict config: Plain configuration, defaults merged with dyc.yaml
+    """
+    plain = dict((key, value) for key, value in config.items() if key != "file_list")
+    dump = json.dumps([CACHE_VERSION, plain], sort_keys=True, default=str)
+    return hashlib.sha1(dump.encode("utf-8")).hexdigest()
+
+
+def content_hash(text):
+    """
+    Hashes the content of a file
+    Parameters
+    ----------
+    str text: Content of the file
+    """
+    return hashlib.sha1(text.encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def cache_entry(filename, text, findings):
+    """
+    Builds the cache entry of a file, i.e its size, mtime and content
+    hash along with its findings. Returns None when the file is gone
+    Parameters
+    ----------
+    str filename: path of the file
+    str text: Content the findings were detected in
+    list findings: Undocumented tops, classes and methods of the file
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    mtime = stat.st_mtime_ns
+    if time.time() - stat.st_mtime < RACY_SECONDS:
+        # The file may change again within the same mtime, so its
+        # content will be hashed on the next run
+        mtime = None
+    return {
+        "size": stat.st_size,
+        "mtime": mtime,
+        "hash": content_hash(text),
+        "findings": [
+            dict((key, value) for key, value in finding.items() if key != "path")
+            for finding in findings
+        ],
+    }
+
+
+class ScanCache(object):
+    """
+    Detection results of the files, stored in a directory at the root
+    of the project. Entries are keyed by absolute path
+    """
+
+    def __init__(self, directory, config):
+        self.directory = directory
+        self.path = os.path.join(directory, CACHE_FILE)
+        self.config = config_hash(config)
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """
+        Reads the stored entries, unless they were stored for another
+        configuration or cannot be read
+        """
+        try:
+            with open(self.path, "r") as stream:
+                stored = json.load(stream)
+        except (IOError, OSError, ValueError):
+            return
+        if isinstance(stored, dict) and stored.get("config") == self.config:
+            self.entries = stored.get("files") or {}
+        else:
+            self.dirty = True
+
+    def get(self, filename):
+        """
+        Returns the cached findings of a file, or None when the file
+        changed. A file with the same size and mtime is not read, a
+        touched file is only read to compare its content hash
+        Parameters
+        ----------
+        str filename: path of the file
+        """
+        key = os.path.abspath(filename)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        if stat.st_size != entry["size"]:
+            return None
+        if stat.st_mtime_ns != entry["mtime"]:
+            try:
+                with open(filename, "r") as stream:
+                    digest = content_hash(stream.read())
+            except (IOError, OSError, UnicodeDecodeError):
+                return None
+            if digest != entry["hash"]:
+                return None
+            if time.time() - stat.st_mtime >= RACY_SECONDS:
+                entry["mtime"] = stat.st_mtime_ns
+                self.dirty = True
+        return [
+            dict([("path", filename)] + list(finding.items()))
+            for finding in entry["findings"]
+        ]
+
+    def put(self, filename, text, findings):
+        """
+        Stores the findings of a file against the content they were
+        detected in
+        Parameters
+        ----------
+        str filename: path of the file
+        str text: Content the findings were detected in
+        list findings: Undocumented tops, classes and methods of the file
+        """
+        self.put_entry(filename, cache_entry(filename, text, findings))
+
+    def put_entry(self, filename, entry):
+        """
+        Stores an entry built by cache_entry, i.e in a scanning process
+        Parameters
+        ----------
+        str filename: path of the file
+        dict entry: Size, mtime, content hash and findings of the file
+        """
+        if entry is None:
+            return
+        self.entries[os.path.abspath(filename)] = entry
+        self.dirty = True
+
+    def save(self):
+        """
+        Writes the entries back when they changed
+        """
+        if not self.dirty:
+            return
+        if dump(self.path, {"config": self.config, "files": self.entries}):
+            self.dirty = False
+
+
+def dump(path, data):
+    """
+    Writes JSON to a file of a cache directory, through a temporary file
+    so that an interrupted run never leaves a broken cache behind. The
+    directory is created, ignored by git, when missing. Returns whether
+    the file was written
+    Parameters
+    ----------
+    str path: Path of the file
+    dict data: Content of the file
+    """
+    directory = os.path.dirname(path)
+    try:
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+            with open(os.path.join(directory, ".gitignore"), "w") as stream:
+                stream.write("*\n")
+        temporary = path + ".tmp"
+        with open(temporary, "w") as stream:
+            json.dump(data, stream, separators=(",", ":"))
+        os.replace(temporary, path)
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def files_hash(paths):
+    """
+    Hashes the content of YAML files, a missing file counts as empty
+    Parameters
+    ----------
+    list paths: Paths of the files
+    """
+    digest = hashlib.sha1(str(CACHE_VERSION).encode("utf-8"))
+    for path in paths:
+        try:
+            with open(path, "rb") as stream:
+                content = stream.read()
+        except (IOError, OSError):
+            content = b""
+        digest.update(hashlib.sha1(content).digest())
+    return digest.hexdigest()
+
+
+class ConfigCache(object):
+    """
+    Config merged out of `defaults.yaml` and `dyc.yaml`, stored as JSON
+    along with a hash of both files, so that a run with the same files
+    skips parsing and merging them
+    """
+
+    def __init__(self, paths, directory=CONFIG_DIRECTORY):
+        self.key = files_hash(paths)
+        self.path = os.path.join(directory, CONFIG_FILE)
+
+    def get(self):
+        """
+        Returns the stored config, or None when the files changed
+        since it was stored
+        """
+        try:
+            with open(self.path, "r") as stream:
+                stored = json.load(stream)
+        except (IOError, OSError, ValueError):
+            return None
+        if isinstance(stored, dict) and stored.get("key") == self.key:
+            return stored.get("config")
+        return None
+
+    def put(self, config):
+        """
+        Stores a merged config. Configs that JSON would alter, i.e with
+        keys that are not strings, are not stored
+        Parameters
+        ----------
+        dict config: Merged config and whether dyc.yaml could be used
+        """
+        try:
+            if json.loads(json.dumps(config)) != config:
+                return
+        except (TypeError, ValueError):
+            return
+        dump(self.path, {"key": self.key, "config": config})
+
+
+def open_cache(config):
+    """
+    Opens the scan cache of a run in the `cache` directory of the
+    configuration. Returns None when caching is turned off
+    Parameters
+    ----------
+    dict config: Plain configuration, defaults merged with dyc.yaml
+    """
+    directory = config.get("cache")
+    if not directory:
+        return None
+    return ScanCache(directory, config)
@@ -1,103 +1,69 @@
 from ..base import Builder
-import re
 from .ClassInterface import ClassInterface
-from ..utils import (
-    get_leading_whitespace,
-    count_lines,
-    get_indent_forward,
-    get_indent_backward,
-)
-import click
+from ..utils import get_leading_whitespace
 import os
+import sys
+import click
 
 
 class ClassBuilder(Builder):
     already_printed_filepaths = []  # list of already printed files
 
-    def initialize(self, change=None):
-
+    def candidates(self, change=None):
+        """
+        Yields the undocumented classes found by the engine of the file,
+        leaving out ignored names. In diff mode only the ones touching
+        added lines are kept
+        Parameters
+        ----------
+        dict change: Change of the file from a diff, if any
+        """
         patches = []
         if change:
             patches = change.get("additions")
 
-        with open(self.filename, 'r') as file:
-            file_lines = file.read()
-            class_support_regex = self.config.get("regex")
-            class_indicator = self.config.get("class_indicator")
-            class_end_name = self.config.get("class_end_name")
-            class_end = self.config.get("class_end")
-            doc_open = self.config.get("doc_open")
-            doc_close = self.config.get("doc_close")
-            within_scope = self.config.get("within_scope")
-            if not class_support_regex:
-                class_indicator = re.escape(class_indicator)
-                #doc_open = re.escape(doc_open)
-                #doc_close = re.escape(doc_close)
-                class_end_name = re.escape(class_end_name)
-                class_end = re.escape(class_end)
-            pattern = "("+class_indicator+")"+"\s+"+"(\S*)"+"\s*("+class_end_name+"(.*?))?("+class_end+")"
-            if not within_scope:
-                pattern = "(" + doc_close + ")?\s*" + pattern
-            else:
-                pattern = pattern + "\s*(" + doc_open + ")?"
-            regex = re.compile(pattern,flags=re.DOTALL)
-            match_iter = regex.finditer(file_lines)
-            match_list = []
-            #only add classes that don't have documentatino before or after them
-            for i in match_iter:
-                if (not within_scope and i.groups()[0] is None) or (within_scope and i.groups()[len(i.groups())-1] is None):
-                    match_list.append(i)
-            #NOTE: handling of self.config.get('comments') was taken out. Doesn't seem real useful
-            found = (len(match_list) > 0)
-            for i in match_list:
-                start = 0
-                end = 0
-                class_name = ""
-
-                if not within_scope:
-                    class_name = i.groups()[2]
-                    start = i.start(2)
-                    end = i.end(5)
-                    if end == -1: #no inheritance
-                        end = i.end(3)
-                else:
-                    class_name = i.groups()[1]
-                    start = i.start(1)
-                    end = i.end(4)
-                    if end == -1: #no inheritance
-                        end = i.end(2)
+        lines = self.source.lines
+        ignore = self.config.get("ignore") or []
+        for candidate in self.source.scanner.classes(self.config):
+            if candidate.documented or candidate.name in ignore:
+                continue
+            if change and not self._is_line_part_of_patches(
+                lines.lineno(candidate.start), lines.lineno(candidate.end), patches
+            ):
+                continue
+            yield candidate
 
-                if change and found:
-                    #get match from file
-                    line = file_lines[start:end+1]
-                    #index to start counting at 
-                    lineno = count_lines(file_lines,start)
-                    found = self._is_line_part_of_patches(lineno, line, patches)
+    def initialize(self, change=None):
+        """
+        Collects the undocumented classes to prompt for. Interfaces
+        point at the classes by offset, no text is copied out of the file
+        Parameters
+        ----------
+        dict change: Change of the file from a diff, if any
+        """
+        file_lines = self.source.text
+        for candidate in self.candidates(change=change):
+            start = candidate.start
+            end = candidate.end
 
-                if not self.details.get(self.filename):
-                    self.details[self.filename] = dict()
+            if not self.details.get(self.filename):
+                self.details[self.filename] = dict()
 
-                if found:
-                    all_string = file_lines[start:end+1] # entire match
-                    indent = ""
-                    if(within_scope):
-                        indent = get_indent_forward(file_lines,end+1)
-                    else:
-                        indent = get_indent_backward(file_lines,start-1)
-                    result = ClassInterface(
-                            plain=all_string,
-                            name=class_name,
-                            start=start,
-                            end=end,
-                            indent=indent,
-                            filename=self.filename,
-                            config=self.config,
-                            leading_space=get_leading_whitespace(all_string),
-                            placeholders=self.placeholders,
-                        )
+            result = ClassInterface(
+                    name=candidate.name,
+                    start=start,
+                    end=end,
+                    indent=candidate.indent,
+                    filename=self.filename,
+                    config=self.config,
+                    leading_space=sys.intern(
+                        get_leading_whitespace(file_lines, start, end + 1)
+                    ),
+                    placeholders=self.placeholders,
+                )
 
-                    if self.validate(result):
-                        self.details[self.filename][result.name] = result
+            if self.validate(result):
+                self.details[self.filename][result.name] = result
 
     def validate(self, result):
         """
@@ -128,52 +94,56 @@ class ClassBuilder(Builder):
         """
         Abstract prompt method in builder to execute prompts over candidates
         """
+        if self.placeholders:
+            # Nothing to confirm, the docstrings are rendered in one call
+            interfaces = [i for i in self._class_interface_gen() if i]
+            for class_interface in interfaces:
+                class_interface.collect()
+            ClassInterface.format_all(interfaces)
+            return
         for class_interface in self._class_interface_gen():
             class_interface.prompt() if class_interface else None
 
     def apply(self):
         """
         Over here we are looping over the result of the
-        chosen classs to document and applying the changes to the
-        files as confirmed
+        chosen classs to document and queueing the changes on the
+        source buffer as confirmed. Offsets refer to the original text
+        so the buffer splices every docstring in a single pass
         """
-        #reverse list to edit file from bottom to top
-        for class_interface in self._class_interface_gen(reverse=True):
+        file_text = self.source.text
+        for class_interface in self._class_interface_gen():
             if not class_interface:
                 continue
-            with open(class_interface.filename, 'r+') as file_handle:
-                file_text = file_handle.read()
-                file_handle.seek(0)
-                if not self.config.get("within_scope"):
-                    #write before new line
-                    new_line_index = file_text[0:class_interface.start].rfind("\n")
-                    #are we at top of file?
-                    if new_line_index == -1:
-                        new_line_index = class_interface.start-1
-                    file_handle.write(file_text[0:new_line_index+1] + class_interface.result + file_text[new_line_index+1:])
-    
+            if not self.config.get("within_scope"):
+                #write before new line
+                new_line_index = file_text.rfind("\n", 0, class_interface.start)
+                #are we at top of file?
+                if new_line_index == -1:
+                    new_line_index = class_interface.start-1
+                self.source.insert(new_line_index+1, class_interface.result)
+            else:
+                #write after new line
+                new_line_index = file_text.find("\n", class_interface.end)
+                #are we at bottom of file?
+                if new_line_index == -1:
+                    self.source.insert(len(file_text), "\n" + class_interface.result)
                 else:
-                    #write after new line
-                    new_line_index = file_text[class_interface.end:].find("\n")
-                    add_line = ""
-                    #are we at bottom of the file?
-                    if new_line_index == -1:
-                        add_line = "\n"
-                        new_line_index = 0
-                    file_handle.write(file_text[0:class_interface.end+new_line_index+1] + add_line + class_interface.result + file_text[class_interface.end+new_line_index+1:])
+                    self.source.insert(new_line_index+1, class_interface.result)
 
     def _class_interface_gen(self,reverse=False):
         """
         A generator that yields the class interfaces
         """
-        if not self.details:
+        func_pack = self.details.get(self.filename)
+        if not func_pack:
             yield None
+            return
 
-        for filename, func_pack in self.details.items():
-            if(reverse):
-                for class_interface in reversed(func_pack.values()):
-                    yield class_interface
-            else:
-                for class_interface in func_pack.values():
-                    yield class_interface
+        if(reverse):
+            for class_interface in reversed(func_pack.values()):
+                yield class_interface
+        else:
+            for class_interface in func_pack.values():
+                yield class_interface
  
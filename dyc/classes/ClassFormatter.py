@@ -1,27 +1,59 @@
-from ..utils import (
-    BlankFormatter,
-    add_start_end,
-    convert_indent,
-)
-import copy
+from ..utils import add_start_end
+from ..templates import CLASS_LAYOUT
 import sys
 import click
 
 
-class ClassFormatter:
-    formatted_string = "{doc_open}\n{break_after_open}{class_docstring}{break_after_docstring}{empty_line}{break_before_close}\n{doc_close}"
-    fmt = BlankFormatter()
+class ClassFormatter(object):
+
+    # Set when the docstring is rendered
+    __slots__ = ("class_format", "result")
+
+    formatted_string = CLASS_LAYOUT
 
     def format(self):
         """
         Public formatting method that executes a pattern of classs to
-        complete the process
+        complete the process. Docstrings that come out the same are
+        only rendered once per format
+        """
+        self.result = self.config.plan.render(self.shape(), self.render)
+        self.polish()
+
+    @staticmethod
+    def format_all(interfaces):
+        """
+        Formats the docstrings of many classes of a format in one call,
+        once they were all prompted, i.e with placeholders
+        Parameters
+        ----------
+        list interfaces: Class interfaces of the same format
+        """
+        if not interfaces:
+            return
+        plan = interfaces[0].config.plan
+        results = plan.render_many(
+            (interface.shape(), interface.render) for interface in interfaces
+        )
+        for interface, result in zip(interfaces, results):
+            interface.result = result
+            interface.polish()
+
+    def shape(self):
+        """
+        Everything the docstring depends on besides the format
+        """
+        return (self.class_docstring, self.indent)
+
+    def render(self):
+        """
+        Renders the docstring, indented but not yet confirmed
         """
         self.pre()
         self.build_docstrings()
-        self.result = self.fmt.format(self.formatted_string, **self.class_format)
+        self.result = self.config.plan.layout.render(self.class_format)
         self.add_indentation()
-        self.polish()
+        return self.result
 
     def wrap_strings(self, words):
         """
@@ -39,30 +71,10 @@ class ClassFormatter:
     def pre(self):
         """
         In the formatter, this method sets up the object that
-        will be used in a formatted way,. Also translates configs
-        into consumable values
+        will be used in a formatted way. Configs are already translated
+        into consumable values once by the compiled format spec
         """
-        class_format = copy.deepcopy(self.config)
-        class_format["indent"] = (
-            convert_indent(class_format["indent"]) if class_format["indent"] else "    "
-        )
-        class_format["indent_content"] = (
-            convert_indent(class_format["indent"])
-            if class_format["indent_content"]
-            else ""
-        )
-        class_format["break_after_open"] = (
-            "\n" if class_format["break_after_open"] else ""
-        )
-        class_format["break_after_docstring"] = (
-            "\n" if class_format["break_after_docstring"] else ""
-        )
-        class_format["break_before_close"] = (
-            "\n" if class_format["break_before_close"] else ""
-        )
-        class_format["empty_line"] = "\n"
-
-        self.class_format = class_format
+        self.class_format = dict(self.config.format)
 
     def build_docstrings(self):
         """
@@ -126,7 +138,7 @@ class ClassFormatter:
         docstring = self.result.split("\n")
         polished = "\n".join([self.leading_space + docline for docline in docstring])
         if self.placeholders:
-            self.result = polished
+            self.result = polished + "\n"
         else:
             self.confirm(polished)
 
@@ -3,9 +3,25 @@ import click
 
 
 class ClassInterface(ClassFormatter):
+    """
+    Undocumented class of a file. Only its offsets in the file are
+    kept, the prompted docstring is set once it is prompted for
+    """
+
+    __slots__ = (
+        "name",
+        "start",
+        "end",
+        "indent",
+        "filename",
+        "config",
+        "leading_space",
+        "placeholders",
+        "class_docstring",
+    )
+
     def __init__(
         self,
-        plain,
         name,
         start,
         end,
@@ -15,13 +31,11 @@ class ClassInterface(ClassFormatter):
         leading_space,
         placeholders,
     ):
-        self.plain = plain
         self.name = name
         self.start = start
         self.end = end
         self.indent = indent
         self.filename = filename
-        self.class_docstring = ""
         self.config = config
         self.leading_space = leading_space
         self.placeholders = placeholders
@@ -31,9 +45,15 @@ class ClassInterface(ClassFormatter):
         Wrapper method for prompts and calls for prompting
         classs then formats them
         """
-        self._prompt_docstring()
+        self.collect()
         self.format()
 
+    def collect(self):
+        """
+        Prompts for the docstring of the class, without formatting it
+        """
+        self._prompt_docstring()
+
     def _prompt_docstring(self):
         """
         Simple prompt for a class's docstring
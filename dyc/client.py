@@ -0,0 +1,55 @@
+"""
+Client side of `dyc serve`. Requests are single lines of JSON-RPC 2.0
+sent over the Unix socket of the project, and so are their responses.
+
+This module only imports the standard library, so that a command
+answered by the server does not pay for the imports of a local run.
+Error responses are raised as ServerError, along with their code.
+"""
+import os
+import json
+import socket
+from .exceptions import ServerError
+
+SOCKET_PATH = os.path.join(".dyc-cache", "dyc.sock")
+TIMEOUT = 60  # Seconds to wait for the response of a request
+FAILED = 1  # Error code of a request that could not run, i.e a bad --base
+STALE = 2  # Error code of a server whose dyc.yaml changed
+
+
+def request(method, params=None, path=SOCKET_PATH, timeout=TIMEOUT):
+    """
+    Sends a request to the server of the project and returns its result.
+    Returns None when no server is listening, so that the caller runs
+    the command itself
+    Parameters
+    ----------
+    str method: Name of the method i.e check
+    dict params: Parameters of the method
+    str path: Path of the Unix socket
+    int timeout: Seconds to wait for the response
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    message = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(path)
+    except (IOError, OSError):
+        client.close()
+        return None
+    try:
+        client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        line = client.makefile("rb").readline()
+    except (IOError, OSError):
+        return None
+    finally:
+        client.close()
+    if not line:
+        return None
+    response = json.loads(line.decode("utf-8"))
+    if "error" in response:
+        error = response["error"]
+        raise ServerError(error.get("code"), error.get("message"))
+    return response.get("result")
@@ -6,10 +6,28 @@ DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'defaults.yam
 CUSTOM = os.path.join(ROOT_PATH, 'dyc.yaml')
 
 
+class YAMLFile(object):
+    """
+    Class attribute holding the content of a YAML file. The file is only
+    read on first use, and then kept for the rest of the run
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.loaded = False
+        self.value = None
+
+    def __get__(self, instance, owner):
+        if not self.loaded:
+            self.value = read_yaml(self.path)
+            self.loaded = True
+        return self.value
+
+
 class Config(object):
 
-    default = read_yaml(DEFAULT)
-    custom = read_yaml(CUSTOM)
+    default = YAMLFile(DEFAULT)
+    custom = YAMLFile(CUSTOM)
 
     def override(self):
         """
@@ -37,6 +55,10 @@ class Config(object):
             cnf_index = self._get_custom_extension_index(extension)
             try:
                 for nested_key, nested_obj in value.items():
+                    if not isinstance(nested_obj, dict):
+                        # Plain values of a format i.e `engine`
+                        self.plain.get('formats')[cnf_index][nested_key] = nested_obj
+                        continue
                     try:
                         self.plain.get('formats')[cnf_index][nested_key].update(
                             **nested_obj
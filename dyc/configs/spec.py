@@ -0,0 +1,176 @@
+"""
+Compiled configuration of the formats. Every `formats` entry is turned
+once per run into a read-only FormatSpec that holds the values the
+engines and formatters would otherwise work out again for every file
+and every docstring.
+"""
+from types import MappingProxyType
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+from ..utils import convert_indent
+from ..templates import (
+    CLASS_FIELDS,
+    CLASS_LAYOUT,
+    METHOD_FIELDS,
+    METHOD_LAYOUT,
+    TOP_FIELDS,
+    TOP_LAYOUT,
+    DocstringPlan,
+)
+from ..engines.RegexEngine import (
+    compile_keyword,
+    compile_method_pattern,
+    compile_class_pattern,
+)
+
+
+def freeze(value):
+    """
+    Returns a read-only copy of a parsed yaml value
+    Parameters
+    ----------
+    object value: dict, list or scalar from the configuration
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def resolve_format(config):
+    """
+    Translates the layout configs of a section into the consumable
+    values used by the formatted strings
+    Parameters
+    ----------
+    dict config: Section configuration i.e method, class or top
+    """
+    result = dict(config)
+    result["indent"] = (
+        convert_indent(result.get("indent")) if result.get("indent") else "    "
+    )
+    result["indent_content"] = (
+        convert_indent(result["indent"]) if result.get("indent_content") else ""
+    )
+    for key in ("break_after_open", "break_after_docstring", "break_before_close"):
+        result[key] = "\n" if result.get(key) else ""
+    result["empty_line"] = "\n"
+    return result
+
+
+def resolve_title(title, underline):
+    """
+    Builds a title line, underlined with dashes if asked for
+    Parameters
+    ----------
+    str title: Title text i.e Parameters
+    bool underline: Add a dashes line below the title
+    """
+    if not title:
+        return title
+    if underline:
+        return "{}\n{}\n".format(title, "-" * len(title))
+    return "{}\n".format(title)
+
+
+class Spec(Mapping):
+    """
+    Read-only mapping over a configuration with precompiled attributes
+    """
+
+    def __init__(self, values, **compiled):
+        object.__setattr__(self, "_values", freeze(values))
+        for key, value in compiled.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is read-only".format(type(self).__name__))
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+
+class FormatSpec(Spec):
+    """
+    Compiled `formats` entry. The top, method and class sections are
+    Specs of their own, with their resolved format values, the render
+    plan of their docstrings and, for the regex engine, their compiled
+    patterns
+    """
+
+    def __init__(self, fmt):
+        top = fmt.get("top", {}) or {}
+        cls = fmt.get("class", {}) or {}
+        method = dict(fmt.get("method", {}) or {})
+        method["arguments"] = fmt.get("arguments")
+        method["returns"] = fmt.get("returns")
+        super(FormatSpec, self).__init__(
+            fmt,
+            top=self._top(top),
+            method=self._method(method),
+            cls=self._class(cls),
+        )
+
+    def _top(self, config):
+        if not config:
+            return Spec(config)
+        values = resolve_format(config)
+        return Spec(
+            config,
+            format=freeze(values),
+            plan=DocstringPlan(TOP_LAYOUT, values, TOP_FIELDS),
+        )
+
+    def _class(self, config):
+        if not config.get("class_indicator"):
+            return Spec(config)
+        values = resolve_format(config)
+        return Spec(
+            config,
+            format=freeze(values),
+            plan=DocstringPlan(CLASS_LAYOUT, values, CLASS_FIELDS),
+            keyword=compile_keyword(config.get("class_indicator"), config.get("regex")),
+            pattern=compile_class_pattern(config),
+        )
+
+    def _method(self, config):
+        if not config.get("method_indicator"):
+            return Spec(config)
+        arguments = dict(config.get("arguments") or {})
+        arguments["inline"] = "" if arguments.get("inline") else "\n"
+        arguments["title"] = resolve_title(
+            arguments.get("title"), arguments.get("underline")
+        )
+        returns = dict(config.get("returns") or {})
+        title = resolve_title(returns.get("return_title"), returns.get("return_underline"))
+        if title:
+            returns["title"] = title
+        values = resolve_format(config)
+        return Spec(
+            config,
+            format=freeze(values),
+            plan=DocstringPlan(METHOD_LAYOUT, values, METHOD_FIELDS),
+            argument_format=freeze(arguments),
+            return_format=freeze(returns),
+            keyword=compile_keyword(config.get("method_indicator"), config.get("regex")),
+            pattern=compile_method_pattern(config),
+        )
+
+
+def compile_formats(formats):
+    """
+    Compiles every `formats` entry, keyed by extension
+    Parameters
+    ----------
+    list formats: `formats` entries of the parsed configuration
+    """
+    return {fmt.get("extension"): FormatSpec(fmt) for fmt in formats or []}
@@ -1,151 +1,241 @@
 """
-Ideally, this file is to get the current staged
-in Git Diff, then creates a `.dyc.patch` temporary file.
-
-The file will patch will undergo the process of:
-1 - See where the `Added` lines fall in
-2 - Extract methods that fall within the added lines and dump them into `.dyc.patch`
+Ideally, this file is to get the changes of the Git working tree,
+either uncommitted ones against `HEAD` or the ones of a whole branch
+against its merge base with another ref.
+
+The diff will undergo the process of:
+1 - Stream the output of git once and split it into one record per file
+2 - See where the `Added` lines fall in, so that only methods that
+    fall within the added lines are documented
 """
 import os
+import re
 import git
+import click
 import ntpath
-from .utils import get_hunk, get_additions_in_first_hunk
+import tempfile
+import subprocess
+from git.exc import GitCommandError
+from .utils import parse_hunk_header, signature, HunkIndex
 from .base import Processor
 
 
+ESCAPES = {
+    'a': '\a', 'b': '\b', 't': '\t', 'n': '\n', 'v': '\v', 'f': '\f', 'r': '\r',
+    '"': '"', '\\': '\\',
+}
+ESCAPE = re.compile(r'\\([0-7]{3}|.)')
+
+
+def unquote(name):
+    """
+    Undoes the C-style quoting git applies to paths with unusual
+    characters, i.e "b/caf\\303\\251.py" is b/café.py
+    Parameters
+    ----------
+    str name: Path as git writes it in the headers of a diff
+    """
+    if len(name) < 2 or not name.startswith('"') or not name.endswith('"'):
+        return name
+    result = bytearray()
+    index = 1
+    for match in ESCAPE.finditer(name, 1, len(name) - 1):
+        result.extend(name[index:match.start()].encode('utf-8'))
+        escape = match.group(1)
+        if len(escape) == 3:
+            result.append(int(escape, 8))
+        else:
+            result.extend(ESCAPES.get(escape, escape).encode('utf-8'))
+        index = match.end()
+    result.extend(name[index:-1].encode('utf-8'))
+    return result.decode('utf-8', 'replace')
+
+
 class DiffParser:
 
     PREFIX = 'diff --git'
-
-    def parse(self, staged=False):
-        """
-        Main parser method that gets all the mandatory information from
-        a Diff chunk
+    TARGET = '+++ '
+    ENV = {'GIT_LITERAL_PATHSPECS': '1'}  # Given paths are never globs
+
+    def parse(self):
+        """
+        Main parser method. Streams the diff of the working tree against
+        the target commit, without context lines, and gets all the
+        mandatory information of every file in a single pass over its
+        output. Files are keyed by path
+        """
+        if self.paths is not None and not self.paths:
+            # None of the given files can be documented
+            return {}
+        states = self._states()
+        command = ['git', 'diff', self.target(), '-U0', '--no-color', '--no-ext-diff']
+        command.append('--')
+        command.extend(self.paths or ())
+        records = {}
+        # Warnings, i.e of core.autocrlf, go to a file. A pipe that is
+        # never read would block git once its buffer is full
+        with tempfile.TemporaryFile() as errors:
+            process = subprocess.Popen(
+                command,
+                cwd=self.repo.working_dir,
+                env=dict(os.environ, **self.ENV),
+                stdout=subprocess.PIPE,
+                stderr=errors,
+            )
+            try:
+                lines = (
+                    line.decode('utf-8', 'replace').rstrip('\n')
+                    for line in process.stdout
+                )
+                for path, additions in self._split(lines, accept=self.is_candidate):
+                    staged, unstaged = states.get(path, (False, False))
+                    records[path] = dict(
+                        path=path,
+                        name=ntpath.basename(path),
+                        additions=additions,
+                        staged=staged,
+                        unstaged=unstaged,
+                    )
+            finally:
+                process.stdout.close()
+                status = process.wait()
+            if status != 0:
+                errors.seek(0)
+                stderr = errors.read().decode('utf-8', 'replace')
+                raise GitCommandError(command, status, stderr)
+        return records
+
+    def _split(self, lines, accept=None):
+        """
+        Splits a diff into its files as its lines come, yielding the
+        path of every file with the exact lines it gained. As the diff
+        has no context lines, the new range of every hunk header is
+        exactly the run of lines it added, and the body of the hunks is
+        not looked at. Deleted files and files that are not accepted
+        are skipped without keeping any of their text
+        Parameters
+        ----------
+        iterable lines: Lines of a diff text without context i.e -U0
+        callable accept: Tells if a path is a candidate to documenting
+        """
+        path = None
+        additions = None
+        in_headers = False
+        for line in lines:
+            if line.startswith(self.PREFIX):
+                if path is not None:
+                    yield path, additions
+                path = None
+                additions = None
+                in_headers = True
+            elif in_headers:
+                if line.startswith(self.TARGET):
+                    in_headers = False
+                    path = self._target(line[len(self.TARGET):])
+                    if path is not None and accept and not accept(path):
+                        click.echo(
+                            'File {} is not a candidate to apply DYC'.format(path),
+                            err=True,
+                        )
+                        path = None
+                    if path is not None:
+                        additions = HunkIndex()
+            elif additions is not None and line.startswith('@@'):
+                header = parse_hunk_header(line)
+                if header:
+                    additions.add(header[2], header[3])
+        if path is not None:
+            yield path, additions
+
+    def _target(self, name):
+        """
+        Path of a file after the change, from the `+++` header of its
+        diff. None when the file was deleted. Git ends the names with
+        spaces with a tab and quotes the unusual ones
         Parameters
         ----------
-        bool staged: Only using the staged files
+        str name: Name given by the header i.e b/dyc/main.py
         """
-        self.diffs = self.repo.index.diff('HEAD' if staged else None)
-        self.plain = self.repo.git.diff('HEAD').split('\n')
-        return self._pack()
+        if name.endswith('\t'):
+            name = name[:-1]
+        name = unquote(name)
+        if name == '/dev/null':
+            return None
+        return name[2:] if name.startswith('b/') else name
 
-    def _pack(self):
+    def _states(self):
         """
-        Wrapper that packs the information that'll be parsed
+        Tells for every changed file if it has staged changes, unstaged
+        changes or both. Only the diffed files are compared to the index
         """
-        patches = []
-        for diff in self.diffs:
-            if not self.is_candidate(diff.a_path):
-                print('File {} is not a candidate to apply DYC'.format(diff.a_path))
-                continue
-            sep = '{} a/{} b/{}'.format(self.PREFIX, diff.a_path, diff.b_path)
-            patch = self.__clean(self.__patch(sep), diff)
-            patches.append(patch)
-        return patches
+        staged = self._staged()
+        unstaged = self._names('--', *(self.paths or ()))
+        return dict(
+            (path, (path in staged, path in unstaged)) for path in staged | unstaged
+        )
 
-    def is_candidate(self, path):
+    def _staged(self):
         """
-        Check if a file is a candidate to being documented
-        after looking at the allowed files from file_list
-        Parameters
-        ----------
-        str path: path of a file
+        Files that have staged changes. They are only listed again once
+        the index changed, i.e by `git add` or a commit
         """
-        full_path = os.path.join(os.getcwd(), path)
-        return full_path in self.file_list
+        index = signature(os.path.join(self.repo.git_dir, 'index'))
+        if index is None or self.staged is None or self.staged[0] != index:
+            self.staged = (index, self._names('--cached'))
+        return self.staged[1]
 
-    def __patch(self, separator):
+    def _names(self, *args):
         """
-        A method that returns a patch
+        Paths of the files git diff lists with the given arguments
         Parameters
         ----------
-        str separator: Main separators from a diff chunk
-        """
-        patch = []
-        hit = False
-        # end = False
-        for line in self.plain:
-            if line == separator:
-                hit = True
-                continue
-            elif line.startswith(self.PREFIX) and hit:
-                break
-            elif hit:
-                patch.append(line)
-        return '\n'.join(patch)
-
-    def __pack(self, patch):
-        """
-        Packer to get from the chunk of diffs and attach
-        to additions
-        Parameters
-        ----------
-        str patch: Patched diff text
-        """
-        final = []
-        result = []
-        hit = False
-        start, end = None, None
-        for index, line in enumerate(patch):
-            _hunk = get_hunk(line)
-
-            if (len(patch) - 1) == index:
-                final.append(dict(patch='\n'.join(result), hunk=(start, end)))
-
-            if len(_hunk) and not hit:
-                start, end = get_additions_in_first_hunk(get_hunk(line))
-                hit = True
-                continue
-            elif len(_hunk) and hit:
-                final.append(dict(patch='\n'.join(result), hunk=(start, end)))
-                start, end = get_additions_in_first_hunk(get_hunk(line))
-                result = []
-                hit = True
-            elif hit:
-                result.append(line)
-
-        return final
-
-    def __clean(self, patch, diff):
-        """Returns a clean dict of a path"""
-        result = {}
-        result['additions'] = self.__additions(
-            self.__pack(patch.split('\n')), diff.a_path
-        )  # [{hunk: (start, end), patch:}]
-        result['plain'] = patch
-        result['diff'] = diff
-        result['name'] = ntpath.basename(diff.a_path)
-        result['path'] = diff.a_path
-        return result
-
-    def __additions(self, hunks, path):
-        """
-        Function that returns only the added text in a file
+        list args: Arguments of git diff i.e --cached
+        """
+        output = self.repo.git.diff('--name-only', '-z', *args, env=self.ENV)
+        return frozenset(name for name in output.split('\0') if name)
+
+    def is_candidate(self, path):
+        """
+        Check if a file is a candidate to being documented
+        after looking at the extensions, globs and size allowed by the walker
         Parameters
         ----------
-        list hunks: Group of added texts
         str path: path of a file
         """
-        for hunk in hunks:
-            patch = hunk.get('patch')
-            result = []
-            for line in patch.split('\n'):
-                try:
-                    if line[0] == '+' and not line.startswith('+++'):
-                        l = line[1:]
-                        result.append(l)
-                except IndexError as e:
-                    print(e.message)
-                    continue
-            hunk['patch'] = '\n'.join(result)
-        return hunks
+        return self.walker.accepts(os.path.join(os.getcwd(), path))
 
 
 class Diff(DiffParser, Processor):
-    def __init__(self, config):
+    def __init__(self, config, base=None, paths=None):
         self.repo = git.Repo(os.getcwd())
         self.config = config
-        self.prepare()
+        self.base = base
+        self.prepare(files=paths or [])
+        # Given paths, i.e from pre-commit, are checked one by one and
+        # only them are diffed, the working tree is never walked
+        self.paths = list(self.file_list) if paths else None
+        self.staged = None
+
+    def select(self, paths):
+        """
+        Narrows the next diffs down to some files, keeping the repository
+        and the walker. Files are checked one by one, as with pre-commit.
+        The whole working tree is diffed again when there are none
+        Parameters
+        ----------
+        list paths: Paths of the files to diff
+        """
+        self.paths = list(self.walker.filter(paths)) if paths else None
+
+    def target(self):
+        """
+        Commit the working tree is compared to. `HEAD` for uncommitted
+        changes, or the merge base of `HEAD` and the base ref, so that
+        the whole branch is covered by a single diff
+        """
+        if not self.base:
+            return 'HEAD'
+        return self.repo.git.merge_base(self.base, 'HEAD').strip()
 
     @property
     def uncommitted(self):
@@ -157,6 +247,6 @@ class Diff(DiffParser, Processor):
     def _uncommitted(self):
         """
         Private method to return the data for the publish uncommitted
-        property
+        property, keyed by path
         """
-        return self.parse() + self.parse(staged=True)
+        return self.parse()
@@ -2,16 +2,15 @@
 This file gets configuration from parser.ParsedConfig
 and handles all the commands from the command line.
 """
+import sys
 import click
 from .parser import ParsedConfig
-from .main import DYC
-from .diff import Diff
-from .events import Watcher
-import sys
-import time
-import logging
-from watchdog.observers import Observer
-from watchdog.events import LoggingEventHandler
+from .report import REPORTS
+from .client import FAILED, STALE, request
+from .exceptions import ServerError
+
+# Every command imports what it runs on, so that git, watchdog and the
+# builders are only loaded by the commands that need them
 
 config = click.make_pass_decorator(ParsedConfig, ensure=True)
 # ParsedConfig class wrapping all settings, on every Click command,
@@ -33,41 +32,189 @@ def main(config):
 
 @main.command()
 @click.option('--placeholders', is_flag=True, default=False)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    help='Scan files over N processes, only with --placeholders',
+)
+@click.option(
+    '--no-cache', is_flag=True, default=False, help='Scan every file from scratch'
+)
 @click.argument('files', nargs=-1, type=click.Path(exists=True), required=False)
 @config
-def start(config, files, placeholders):
+def start(config, files, placeholders, jobs, no_cache):
     """
     This is the entry point of starting DYC for the whole project.
     When you run `dyc start`. ParsedConfig will wrap all the
     files list going to loop
     over and add missing documentation on.
     """
+    if jobs > 1 and not placeholders:
+        raise click.UsageError('--jobs can only be used with --placeholders')
+    from .main import DYC
+    from .cache import open_cache
+
     files_list = []
     if files:
         config.plain['file_list'] = list(files)
-    dyc = DYC(config.plain, placeholders=placeholders)
+    dyc = DYC(
+        config.plain,
+        placeholders=placeholders,
+        formats=config.formats,
+        cache=None if no_cache else open_cache(config.plain),
+    )
     dyc.prepare()
-    dyc.document()
+    dyc.document(jobs=jobs)
+
+
+@main.command()
+@click.option(
+    '--format',
+    'report_format',
+    type=click.Choice(sorted(REPORTS)),
+    default='json',
+    help='Format of the report',
+)
+@click.option(
+    '--output',
+    '-o',
+    type=click.File('w'),
+    default='-',
+    help='File to write the report to, defaults to stdout',
+)
+@click.option(
+    '--no-cache', is_flag=True, default=False, help='Scan every file from scratch'
+)
+@click.option(
+    '--base',
+    metavar='REF',
+    help='Only report what was added since the merge base with REF',
+)
+@click.argument('files', nargs=-1, type=click.Path(exists=True), required=False)
+@config
+def check(config, files, report_format, output, no_cache, base):
+    """
+    Reports the undocumented tops, classes and methods without
+    prompting or writing. Exits with 1 when any is found
+    """
+    result = check_server(files, report_format, no_cache, base)
+    if result is None:
+        from .main import check_report
+        from .cache import open_cache
+
+        report, failed = check_report(
+            config,
+            files=files,
+            report_format=report_format,
+            changes=branch_changes(config, base) if base else None,
+            cache=None if no_cache else open_cache(config.plain),
+        )
+    else:
+        report, failed = result['report'], result['failed']
+    output.write(report)
+    output.write('\n')
+    if failed:
+        sys.exit(1)
+
+
+def check_server(files, report_format, no_cache, base):
+    """
+    Hands `dyc check` over to the `dyc serve` of the project. Returns
+    None when there is none, or when it has to be restarted
+    Parameters
+    ----------
+    list files: Files to check, all the files of the project when empty
+    str report_format: Name of the report i.e json or sarif
+    bool no_cache: Scan every file from scratch
+    str base: Only report what was added since the merge base with this ref
+    """
+    params = dict(files=list(files), format=report_format, no_cache=no_cache, base=base)
+    try:
+        return request('check', params)
+    except ServerError as e:
+        if e.code == STALE:
+            click.echo(click.style(str(e), fg='cyan'), err=True)
+            return None
+        if e.code == FAILED and base:
+            raise click.BadParameter(str(e), param_hint='--base')
+        raise click.ClickException(str(e))
 
 
 @main.command()
 @click.option(
     '--watch', help='Add default placeholder when watching', is_flag=True, default=False
 )
+@click.option(
+    '--base',
+    metavar='REF',
+    help='Document what the branch added since its merge base with REF',
+)
+@click.argument('files', nargs=-1, type=click.Path(), required=False)
 @config
-def diff(config, watch):
+def diff(config, watch, base, files):
     """
-    This argument will run DYC on DIFF patch only
+    This argument will run DYC on DIFF patch only. When files are
+    given, i.e by pre-commit, only those are diffed
     """
+    if watch and (base or files):
+        raise click.UsageError('--base and files cannot be used with --watch')
     if watch:
+        from .events import Watcher
+
         Watcher.start(config)
     else:
-        diff = Diff(config.plain)
-        uncommitted = diff.uncommitted
-        paths = [idx.get('path') for idx in uncommitted]
+        from .main import DYC
+
+        uncommitted = branch_changes(config, base, paths=files)
         if len(uncommitted):
-            dyc = DYC(config.plain)
-            dyc.prepare(files=paths)
-            dyc.process_top(diff_only=True, changes=uncommitted)
-            dyc.process_classes(diff_only=True, changes=uncommitted)
-            dyc.process_methods(diff_only=True, changes=uncommitted)
+            dyc = DYC(config.plain, formats=config.formats)
+            dyc.prepare(files=list(uncommitted))
+            for path in dyc.file_list:
+                dyc.process_file(path, diff_only=True, changes=uncommitted)
+
+
+@main.command()
+@click.option('--stop', is_flag=True, default=False, help='Stop the running server')
+@config
+def serve(config, stop):
+    """
+    Keeps the project warm in the background. `dyc check` is answered
+    over a Unix socket, without starting over, until it is stopped
+    """
+    if stop:
+        if request('stop') is None:
+            click.echo('dyc serve is not running', err=True)
+        return
+    from .server import start_server
+
+    try:
+        start_server(config)
+    except ServerError as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        print('Quitting..')
+
+
+def branch_changes(config, base=None, paths=None):
+    """
+    Gets the changes of the working tree keyed by path, against `HEAD`
+    or against the merge base of `HEAD` and a base ref
+    Parameters
+    ----------
+    ConfigParser config: Config going to be used in DYC
+    str base: Ref the branch is compared to i.e origin/main
+    list paths: Only diff these files
+    """
+    from git.exc import GitCommandError
+    from .diff import Diff
+
+    try:
+        return Diff(config.plain, base=base, paths=paths).uncommitted
+    except GitCommandError as e:
+        if not base:
+            raise
+        raise click.BadParameter(
+            '{} ({})'.format(base, (e.stderr or '').strip()), param_hint='--base'
+        )
@@ -0,0 +1,20 @@
+"""
+A candidate is a method or a class found by a detection engine.
+Builders turn the undocumented candidates into interfaces.
+"""
+
+
+class Candidate(object):
+
+    __slots__ = ("kind", "name", "start", "end", "indent", "arguments", "documented")
+
+    def __init__(
+        self, kind, name, start, end, indent, arguments=None, documented=False
+    ):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.end = end
+        self.indent = indent
+        self.arguments = arguments or []
+        self.documented = documented
@@ -0,0 +1,167 @@
+"""
+Detection engine for Python files. It walks the tokens of a file once
+with `tokenize` so that `def` and `class` inside strings or comments are
+never mistaken for declarations, and nothing is searched past the
+end of a declaration.
+"""
+import io
+import tokenize
+from .Candidate import Candidate
+from .RegexEngine import RegexEngine
+
+SKIPPED = (tokenize.COMMENT, tokenize.NL)
+OPENERS = ("(", "[", "{")
+CLOSERS = (")", "]", "}")
+KINDS = {"def": "method", "class": "class"}
+
+
+class PythonEngine(object):
+    def __init__(self, source):
+        self.source = source
+        self.tokens = list(
+            tokenize.generate_tokens(io.StringIO(source.text, newline="").readline)
+        )
+        self.documented = self._module_docstring()
+        self.candidates = self._scan()
+
+    def top(self, config):
+        """
+        Checks if the module already starts with a docstring
+        Parameters
+        ----------
+        dict config: Top configuration of the format
+        """
+        return self.documented
+
+    def methods(self, config):
+        """
+        Returns the functions and methods of the file. Docstrings placed
+        before a declaration are not Python, so the configurable engine
+        takes over when `within_scope` is turned off
+        Parameters
+        ----------
+        dict config: Method configuration of the format
+        """
+        if not config.get("within_scope"):
+            return RegexEngine(self.source).methods(config)
+        return [c for c in self.candidates if c.kind == "method"]
+
+    def classes(self, config):
+        """
+        Returns the classes of the file
+        Parameters
+        ----------
+        dict config: Class configuration of the format
+        """
+        if not config.get("within_scope"):
+            return RegexEngine(self.source).classes(config)
+        return [c for c in self.candidates if c.kind == "class"]
+
+    def _next(self, index):
+        """
+        Index of the first token from index on that is not a comment
+        or a blank line
+        Parameters
+        ----------
+        int index: Index to start looking from
+        """
+        while index < len(self.tokens) and self.tokens[index].type in SKIPPED:
+            index += 1
+        return index
+
+    def _is_docstring(self, index):
+        """
+        Checks if the statement starting at index is a lone string. The
+        string may be implicitly concatenated, wrapped in parentheses
+        and followed by a comment
+        Parameters
+        ----------
+        int index: Index of the first token of the statement
+        """
+        tokens = self.tokens
+        depth = 0
+        while index < len(tokens) and tokens[index].string == "(":
+            depth += 1
+            index = self._next(index + 1)
+        if index >= len(tokens) or tokens[index].type != tokenize.STRING:
+            return False
+        while index < len(tokens) and tokens[index].type == tokenize.STRING:
+            index = self._next(index + 1)
+        while depth and index < len(tokens) and tokens[index].string == ")":
+            depth -= 1
+            index = self._next(index + 1)
+        return (
+            not depth
+            and index < len(tokens)
+            and tokens[index].type in (tokenize.NEWLINE, tokenize.ENDMARKER)
+        )
+
+    def _module_docstring(self):
+        """
+        Checks if the first statement of the module is a docstring
+        """
+        index = self._next(0)
+        if index < len(self.tokens) and self.tokens[index].type == tokenize.ENCODING:
+            index = self._next(index + 1)
+        return self._is_docstring(index)
+
+    def _scan(self):
+        """
+        Single pass over the tokens that collects every def and class
+        with the exact offsets of its header, the indentation of its
+        body and its parameter names. Declarations whose body sits on
+        the same line as the header are skipped since there is no
+        line to put a docstring on
+        """
+        lines = self.source.lines
+        tokens = self.tokens
+        result = []
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token.type != tokenize.NAME or token.string not in KINDS:
+                index += 1
+                continue
+            name = tokens[index + 1].string
+            arguments = []
+            depth = 0
+            previous = None
+            cursor = index + 2
+            while cursor < len(tokens):
+                current = tokens[cursor]
+                if current.type == tokenize.OP:
+                    if current.string in OPENERS:
+                        depth += 1
+                    elif current.string in CLOSERS:
+                        depth -= 1
+                    elif current.string == ":" and depth == 0:
+                        break
+                elif (
+                    current.type == tokenize.NAME
+                    and depth == 1
+                    and previous in ("(", ",", "*", "**")
+                ):
+                    arguments.append(current.string)
+                if current.type not in SKIPPED:
+                    previous = current.string
+                cursor += 1
+            if cursor >= len(tokens):
+                break
+            colon = tokens[cursor]
+            body = self._next(cursor + 1)
+            if body < len(tokens) and tokens[body].type == tokenize.NEWLINE:
+                first = self._next(body + 1)
+                if first < len(tokens) and tokens[first].type == tokenize.INDENT:
+                    result.append(
+                        Candidate(
+                            KINDS[token.string],
+                            name,
+                            lines.offset(*token.start),
+                            lines.offset(*colon.end),
+                            tokens[first].string,
+                            arguments=arguments if token.string == "def" else [],
+                            documented=self._is_docstring(self._next(first + 1)),
+                        )
+                    )
+            index = cursor + 1
+        return result
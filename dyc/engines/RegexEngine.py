@@ -0,0 +1,343 @@
+"""
+Configurable detection engine. It works out of the indicators given
+for a format in `dyc.yaml`, so that it works for any language.
+
+Scanning is bounded: indicators are only looked for at the beginning
+of a line (after optional modifiers such as `async` or `export`), and a
+declaration has to be complete within `scan_lines` lines of its
+indicator. A stray indicator can never make the engine read far ahead.
+Each file is also given a time budget, past which it is skipped.
+"""
+import re
+import time
+from .Candidate import Candidate
+from ..exceptions import ScanTimeout
+from ..utils import get_indent_forward, get_indent_backward
+
+QUOTES = ("'", '"', "`")
+PAIRS = {"(": ")", "[": "]", "{": "}", "<": ">"}
+SCAN_LINES = 20
+
+
+def compile_keyword(indicator, support_regex=False):
+    """
+    Compiles the line-anchored pattern that finds an indicator at the
+    beginning of a line, after optional modifiers
+    Parameters
+    ----------
+    str indicator: Method or class indicator i.e def
+    bool support_regex: The indicator is already a regular expression
+    """
+    if not support_regex:
+        indicator = re.escape(indicator)
+    return re.compile(
+        r"^[ \t]*((?:\S+[ \t]+)*?)(" + indicator + r")(?=\s)", flags=re.MULTILINE
+    )
+
+
+def compile_method_pattern(config):
+    """
+    Compiles the pattern matching a whole method declaration. It is only
+    used when the indicators of a format are regular expressions, and
+    always matched within a bounded window
+    Parameters
+    ----------
+    dict config: Method configuration of the format
+    """
+    method_support_regex = config.get("regex")
+    argument_support_regex = config.get("arguments").get("regex")
+    method_indicator = config.get("method_indicator")
+    start_parameter = config.get("arguments").get("start_parameter")
+    end_parameter = config.get("arguments").get("end_parameter")
+    method_end = config.get("method_end")
+    if not method_support_regex:
+        method_indicator = re.escape(method_indicator)
+        method_end = re.escape(method_end)
+    if not argument_support_regex:
+        start_parameter = re.escape(start_parameter)
+        end_parameter = re.escape(end_parameter)
+    pattern = "("+method_indicator+")"+r"\s+"+"(.*?)"+r"\s*"+start_parameter+"(.*?)"+end_parameter+r"\s*"+"("+method_end+")"
+    return re.compile(pattern,flags=re.DOTALL)
+
+
+def compile_class_pattern(config):
+    """
+    Compiles the pattern matching a whole class declaration. It is only
+    used when the indicators of a format are regular expressions, and
+    always matched within a bounded window
+    Parameters
+    ----------
+    dict config: Class configuration of the format
+    """
+    class_support_regex = config.get("regex")
+    class_indicator = config.get("class_indicator")
+    class_end_name = config.get("class_end_name")
+    class_end = config.get("class_end")
+    if not class_support_regex:
+        class_indicator = re.escape(class_indicator)
+        class_end_name = re.escape(class_end_name)
+        class_end = re.escape(class_end)
+    pattern = "("+class_indicator+")"+r"\s+"+r"(\S*?)"+r"\s*("+class_end_name+"(.*?))?("+class_end+")"
+    return re.compile(pattern,flags=re.DOTALL)
+
+
+def skip_space(text, index, limit):
+    """
+    Moves an index forward over whitespace, up to a limit
+    Parameters
+    ----------
+    str text: Text to walk
+    int index: Index to start at
+    int limit: Index to stop at
+    """
+    while index < limit and text[index].isspace():
+        index += 1
+    return index
+
+
+def find_balanced(text, index, opener, closer, limit):
+    """
+    Finds the closer matching the opener found at index, counting the
+    nested pairs in between. Returns -1 when it is not found before limit
+    Parameters
+    ----------
+    str text: Text to walk
+    int index: Index of the opener
+    str opener: Opening delimiter i.e (
+    str closer: Closing delimiter i.e )
+    int limit: Index to stop at
+    """
+    depth = 0
+    while index < limit:
+        if text.startswith(opener, index):
+            depth += 1
+            index += len(opener)
+            continue
+        if text.startswith(closer, index):
+            depth -= 1
+            if depth == 0:
+                return index
+            index += len(closer)
+            continue
+        index += 1
+    return -1
+
+
+class RegexEngine(object):
+    def __init__(self, source):
+        self.source = source
+        budget = getattr(source, "budget", None)
+        self.deadline = time.time() + budget if budget else None
+
+    def top(self, config):
+        """
+        Checks if the file already starts with a docstring
+        Parameters
+        ----------
+        dict config: Top configuration of the format
+        """
+        text = self.source.text
+        index = text.find(config.get("doc_open"))
+        if index == -1:
+            return False
+        return text[:index].strip() == ""
+
+    def methods(self, config):
+        """
+        Finds the methods of the file
+        Parameters
+        ----------
+        dict config: Method configuration of the format
+        """
+        keyword = getattr(config, "keyword", None) or compile_keyword(
+            config.get("method_indicator"), config.get("regex")
+        )
+        pattern = None
+        if config.get("regex") or config.get("arguments").get("regex"):
+            pattern = getattr(config, "pattern", None) or compile_method_pattern(config)
+        parameter_split = config.get("arguments").get("parameter_split")
+        result = []
+        for start, limit in self._declarations(keyword, config):
+            if pattern:
+                match = pattern.match(self.source.text, start, limit)
+                found = match and (match.group(2), match.group(3), match.end(4))
+            else:
+                found = self._method(start, limit, config)
+            if not found:
+                continue
+            name, parameters, end = found
+            result.append(
+                self._candidate(
+                    "method",
+                    name.strip(),
+                    start,
+                    end,
+                    limit,
+                    config,
+                    arguments=parameters.split(parameter_split),
+                )
+            )
+        return result
+
+    def classes(self, config):
+        """
+        Finds the classes of the file
+        Parameters
+        ----------
+        dict config: Class configuration of the format
+        """
+        keyword = getattr(config, "keyword", None) or compile_keyword(
+            config.get("class_indicator"), config.get("regex")
+        )
+        pattern = None
+        if config.get("regex"):
+            pattern = getattr(config, "pattern", None) or compile_class_pattern(config)
+        result = []
+        for start, limit in self._declarations(keyword, config):
+            if pattern:
+                match = pattern.match(self.source.text, start, limit)
+                found = match and (match.group(2), match.end(5))
+            else:
+                found = self._class(start, limit, config)
+            if not found:
+                continue
+            name, end = found
+            result.append(self._candidate("class", name, start, end, limit, config))
+        return result
+
+    def _check(self):
+        """
+        Stops the scan of a file that went over its time budget
+        """
+        if self.deadline is not None and time.time() > self.deadline:
+            raise ScanTimeout(
+                "Scanning {} took longer than {} seconds".format(
+                    self.source.filename, self.source.budget
+                )
+            )
+
+    def _declarations(self, keyword, config):
+        """
+        Yields the offset of every indicator starting a line, with the
+        end of the window the declaration has to fit in. Indicators
+        following a comment symbol or a quote on their line are skipped
+        Parameters
+        ----------
+        re.Pattern keyword: Compiled line-anchored indicator
+        dict config: Method or class configuration of the format
+        """
+        text = self.source.text
+        lines = self.source.lines
+        comments = tuple(config.get("comments") or ())
+        scan_lines = config.get("scan_lines") or SCAN_LINES
+        for match in keyword.finditer(text):
+            self._check()
+            prefix = match.group(1)
+            if any(symbol in prefix for symbol in comments + QUOTES):
+                continue
+            start = match.start(2)
+            last = lines.lineno(start) + scan_lines
+            limit = lines.offset(last) if last <= len(lines) else len(text)
+            yield start, limit
+
+    def _method(self, start, limit, config):
+        """
+        Reads a method declaration with literal indicators. The name
+        has to be on the line of the indicator and the parameters are
+        read up to their balanced end parameter
+        Parameters
+        ----------
+        int start: Offset of the indicator
+        int limit: End of the window of the declaration
+        dict config: Method configuration of the format
+        """
+        text = self.source.text
+        arguments = config.get("arguments")
+        start_parameter = arguments.get("start_parameter")
+        end_parameter = arguments.get("end_parameter")
+        method_end = config.get("method_end")
+        line_end = text.find("\n", start, limit)
+        if line_end == -1:
+            line_end = limit
+        name_start = start + len(config.get("method_indicator"))
+        opener = text.find(start_parameter, name_start, line_end)
+        if opener == -1 or not text[name_start:opener].strip():
+            return None
+        closer = find_balanced(text, opener, start_parameter, end_parameter, limit)
+        if closer == -1:
+            return None
+        after = skip_space(text, closer + len(end_parameter), limit)
+        if not text.startswith(method_end, after):
+            return None
+        parameters = text[opener + len(start_parameter):closer]
+        return text[name_start:opener], parameters, after + len(method_end)
+
+    def _class(self, start, limit, config):
+        """
+        Reads a class declaration with literal indicators. The name has
+        to be on the line of the indicator, and the class end is the
+        first one found outside of the brackets opened after the name
+        Parameters
+        ----------
+        int start: Offset of the indicator
+        int limit: End of the window of the declaration
+        dict config: Class configuration of the format
+        """
+        text = self.source.text
+        class_end_name = config.get("class_end_name")
+        class_end = config.get("class_end")
+        closer = PAIRS.get(class_end_name)
+        line_end = text.find("\n", start, limit)
+        if line_end == -1:
+            line_end = limit
+        index = skip_space(text, start + len(config.get("class_indicator")), line_end)
+        name_start = index
+        while (
+            index < line_end
+            and not text[index].isspace()
+            and not text.startswith(class_end_name, index)
+            and not text.startswith(class_end, index)
+        ):
+            index += 1
+        if index == name_start:
+            return None
+        name = text[name_start:index]
+        depth = 0
+        while index < limit:
+            if closer and text.startswith(class_end_name, index):
+                depth += 1
+            elif closer and depth and text.startswith(closer, index):
+                depth -= 1
+            elif not depth and text.startswith(class_end, index):
+                return name, index + len(class_end)
+            index += 1
+        return None
+
+    def _candidate(self, kind, name, start, end, limit, config, arguments=None):
+        """
+        Builds a candidate, looking for a docstring right after the
+        declaration when it is within scope, or right before it otherwise
+        Parameters
+        ----------
+        str kind: method or class
+        str name: Name of the method or class
+        int start: Offset of the indicator
+        int end: Offset right after the declaration end
+        int limit: End of the window of the declaration
+        dict config: Method or class configuration of the format
+        list arguments: Raw parameters of a method
+        """
+        text = self.source.text
+        if config.get("within_scope"):
+            after = skip_space(text, end, limit)
+            documented = text.startswith(config.get("doc_open"), after)
+            indent = get_indent_forward(text, end + 1)
+        else:
+            before = start - 1
+            while before >= 0 and text[before].isspace():
+                before -= 1
+            documented = text.endswith(config.get("doc_close"), 0, before + 1)
+            indent = get_indent_backward(text, start - 1)
+        return Candidate(
+            kind, name, start, end, indent, arguments=arguments, documented=documented
+        )
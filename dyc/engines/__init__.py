@@ -0,0 +1,19 @@
+"""
+Detection engines find the methods, classes and top docstring of a
+source buffer. The engine of a format is chosen with the `engine` key
+in `dyc.yaml`, the configurable regex engine being the default one.
+"""
+from .RegexEngine import RegexEngine
+from .PythonEngine import PythonEngine
+
+ENGINES = {"regex": RegexEngine, "python": PythonEngine}
+
+
+def get_engine(name):
+    """
+    Gets the engine class registered under a name
+    Parameters
+    ----------
+    str name: Name of the engine, i.e python
+    """
+    return ENGINES.get(name, RegexEngine)
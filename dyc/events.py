@@ -1,45 +1,317 @@
 """
 This file contains all the event classes used in dyc. It contains
-a Watcher that watches files for changes and a WatchEvent that
-triggers if a file is changed.
+a Watcher that watches files for changes, a WatchEvent that
+triggers if a file is changed and a WatchQueue that gathers the
+changed files into batches.
 """
+import os
 import sys
 import time
 import logging
+import threading
 from watchdog.observers import Observer
-from watchdog.events import LoggingEventHandler
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+    PatternMatchingEventHandler,
+)
 from .diff import Diff
 from .main import DYC
+from .utils import get_extension, signature
 
 
-class WatchEvent(LoggingEventHandler):
+class WatchQueue(object):
+    """
+    Gathers the paths of events and hands them over in batches to a
+    worker thread. The events of a path are coalesced until none came
+    for `debounce` seconds, and a path is dropped when it was not
+    changed since the handler last went over it or wrote it, i.e by
+    DYC itself
+    """
 
-    config = None
+    def __init__(self, handler, debounce=0.5):
+        self.handler = handler
+        self.debounce = debounce
+        self.pending = {}
+        self.written = {}
+        self.running = False
+        self.thread = None
+        self.condition = threading.Condition()
 
-    def dispatch(self, event):
+    def start(self):
+        """
+        Starts the worker thread
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="dyc-watch")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread once it is done with its current batch
         """
-        Temporary dispatch method as a POC for logger.
-        Needs cleanup
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+
+    def put(self, path):
+        """
+        Queues a changed path, pushing back its batch
         Parameters
         ----------
-        FileModifiedEvent event: watchdog file of a modified event
-        """
-        diff = Diff(self.config.plain)
-        uncommitted = diff.uncommitted
-        paths = [
-            idx.get('path')
-            for idx in uncommitted
-            if './{}'.format(idx.get('path')) == event.src_path
-        ]
-        filtered = [
-            idx
-            for idx in uncommitted
-            if './{}'.format(idx.get('path')) == event.src_path
+        str path: Path of a changed file
+        """
+        path = os.path.relpath(path)
+        with self.condition:
+            self.pending[path] = time.monotonic()
+            self.condition.notify()
+
+    def take(self):
+        """
+        Waits for the paths that settled down and takes them out of the
+        queue. Returns None once the queue is stopped
+        """
+        with self.condition:
+            while True:
+                if not self.running:
+                    return None
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                now = time.monotonic()
+                ready = [
+                    path
+                    for path, last in self.pending.items()
+                    if now - last >= self.debounce
+                ]
+                if ready:
+                    for path in ready:
+                        del self.pending[path]
+                    return ready
+                oldest = min(self.pending.values())
+                self.condition.wait(self.debounce - (now - oldest))
+
+    def is_own_write(self, path):
+        """
+        Tells if a file is as the handler left it
+        Parameters
+        ----------
+        str path: Path of a changed file
+        """
+        current = signature(path)
+        return current is not None and self.written.get(path) == current
+
+    def record(self, path):
+        """
+        Keeps the state the handler left a file in, right after it wrote
+        it, so that the events of that write are dropped. Saves made
+        afterwards change the state and are handled
+        Parameters
+        ----------
+        str path: Path of a file written by the handler
+        """
+        self.written[os.path.relpath(path)] = signature(path)
+
+    def run(self):
+        """
+        Worker loop. Every batch is handled once. The files are taken as
+        they were before the handler went over them, and the handler
+        records the ones it writes
+        """
+        while True:
+            ready = self.take()
+            if ready is None:
+                return
+            batch = [path for path in ready if not self.is_own_write(path)]
+            if not batch:
+                continue
+            for path in batch:
+                self.written[path] = signature(path)
+            try:
+                self.handler(batch, self.record)
+            except Exception:
+                logging.exception("Could not document %s", ", ".join(batch))
+
+
+class WatchEvent(PatternMatchingEventHandler):
+    """
+    Queues the files of the events that can be documented. Extensions
+    are matched by watchdog, hidden entries and globs by the walker.
+    Only creations, modifications and moves are looked at, here rather
+    than with the event filter of the observer, which is missing from
+    the watchdog release dyc pins. Directories created or deleted at the
+    root are handed over to the watches of the observer
+    """
+
+    EVENTS = (FileCreatedEvent, FileModifiedEvent, FileMovedEvent)
+
+    def __init__(self, queue, walker, observer=None):
+        patterns = [
+            "*.{}".format(extension) for extension in sorted(walker.extensions)
         ]
-        if len(filtered):
-            dyc = DYC(self.config.plain, placeholders=True)
-            dyc.prepare(files=paths)
-            dyc.process_methods(diff_only=True, changes=uncommitted)
+        super(WatchEvent, self).__init__(
+            patterns=patterns or None, ignore_directories=True, case_sensitive=True
+        )
+        self.queue = queue
+        self.walker = walker
+        self.directories = None
+        if observer is not None:
+            self.directories = DirectoryWatches(observer, self, walker)
+
+    def dispatch(self, event):
+        """
+        Follows the directories of the root and drops the events that
+        are never documented, before they are matched against patterns
+        Parameters
+        ----------
+        FileSystemEvent event: watchdog event
+        """
+        if event.is_directory:
+            if self.directories is not None:
+                self.directories.follow(event)
+            return
+        if isinstance(event, self.EVENTS):
+            super(WatchEvent, self).dispatch(event)
+
+    def on_any_event(self, event):
+        """
+        Queues the files of an event, the batch they end up in is
+        documented on the worker thread. Every directory of their paths
+        is checked against the hidden entries and the exclude globs
+        Parameters
+        ----------
+        FileSystemEvent event: watchdog event of a changed file
+        """
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and self.walker.matches(path):
+                self.queue.put(path)
+
+
+def is_watched(walker, name):
+    """
+    Tells if a directory of the root is watched, i.e it is neither
+    hidden nor excluded
+    Parameters
+    ----------
+    FileWalker walker: Walker of the watched files
+    str name: Name of the directory
+    """
+    return not name.startswith(".") and not walker.exclude.match(name, name)
+
+
+def watched_directories(walker):
+    """
+    Directories of the root that are neither hidden nor excluded. They
+    are watched recursively, and the root itself is not, so that events
+    under `.git` or an excluded directory are never emitted
+    Parameters
+    ----------
+    FileWalker walker: Walker of the watched files
+    """
+    for entry in os.scandir(walker.root):
+        if entry.is_dir(follow_symlinks=False) and is_watched(walker, entry.name):
+            yield entry.path
+
+
+class DirectoryWatches(object):
+    """
+    Recursive watches of the directories of the root. Directories
+    created, moved or deleted at the root while watching are followed,
+    so that the watched set never goes stale
+    """
+
+    def __init__(self, observer, handler, walker):
+        self.observer = observer
+        self.handler = handler
+        self.walker = walker
+        self.watches = {}
+
+    def add(self, path):
+        """
+        Watches a directory of the root, unless it is hidden, excluded
+        or already watched
+        Parameters
+        ----------
+        str path: path of the directory
+        """
+        if path in self.watches:
+            return
+        if not is_watched(self.walker, os.path.basename(path)):
+            return
+        self.watches[path] = self.observer.schedule(self.handler, path, recursive=True)
+
+    def remove(self, path):
+        """
+        Stops watching a directory that is gone
+        Parameters
+        ----------
+        str path: path of the directory
+        """
+        watch = self.watches.pop(path, None)
+        if watch is not None:
+            try:
+                self.observer.unschedule(watch)
+            except KeyError:
+                pass
+
+    def follow(self, event):
+        """
+        Updates the watches after a directory event at the root
+        Parameters
+        ----------
+        FileSystemEvent event: watchdog event of a directory
+        """
+        root = self.walker.root
+        if isinstance(event, (DirDeletedEvent, DirMovedEvent)):
+            if os.path.dirname(event.src_path) == root:
+                self.remove(event.src_path)
+        if isinstance(event, DirCreatedEvent):
+            path = event.src_path
+        elif isinstance(event, DirMovedEvent):
+            path = event.dest_path
+        else:
+            return
+        if os.path.dirname(path) == root:
+            self.add(path)
+
+
+class WatchSession(object):
+    """
+    What a watch keeps between its batches. The repository handle and
+    the walker of its diff, and the formats compiled by the config,
+    are set up once and not for every batch
+    """
+
+    def __init__(self, config):
+        self.diff = Diff(config.plain)
+        self.dyc = DYC(config.plain, placeholders=True, formats=config.formats)
+
+    def document(self, paths, record):
+        """
+        Documents the methods added to a batch of changed files, with a
+        single diff of those files only
+        Parameters
+        ----------
+        list paths: Paths of the changed files
+        callable record: Called with every file as soon as it is written
+        """
+        self.diff.select(paths)
+        uncommitted = self.diff.uncommitted
+        for path in uncommitted:
+            fmt = self.dyc.formats.get(get_extension(path))
+            source = self.dyc.source(path, fmt)
+            self.dyc.process_methods(
+                path, diff_only=True, changes=uncommitted, source=source
+            )
+            if source.write():
+                record(path)
 
 
 class Watcher:
@@ -54,10 +326,18 @@ class Watcher:
         ConfigParser config: Config going to be used in DYC
         """
         logging.basicConfig(level=logging.INFO)
+        session = WatchSession(config)
+        queue = WatchQueue(
+            session.document,
+            debounce=config.plain.get("watch_debounce", 0.5),
+        )
+        walker = session.diff.walker
         observer = Observer()
-        event_handler = WatchEvent()
-        event_handler.config = config
-        observer.schedule(event_handler, '.', recursive=True)
+        event_handler = WatchEvent(queue, walker, observer)
+        observer.schedule(event_handler, walker.root)
+        for directory in watched_directories(walker):
+            event_handler.directories.add(directory)
+        queue.start()
         observer.start()
         try:
             while True:
@@ -66,3 +346,4 @@ class Watcher:
             observer.stop()
             print('Quitting..')
         observer.join()
+        queue.stop()
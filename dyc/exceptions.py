@@ -33,3 +33,17 @@ class DYCConfigurationSetup(DYCError):
 
 class OverrideConfigurations(DYCError):
     pass
+
+
+class ScanTimeout(DYCError):
+    pass
+
+
+class GitUnavailable(DYCError):
+    pass
+
+
+class ServerError(DYCError):
+    def __init__(self, code, message):
+        super(ServerError, self).__init__(message)
+        self.code = code
@@ -5,31 +5,295 @@ DYC (Document Your Code) Class initiator
 is constructed here. It performs all the readings
 
 """
+import io
+import os
+import sys
+import contextlib
 import click
+from concurrent.futures import ProcessPoolExecutor
 from .utils import get_extension
 from .methods.MethodBuilder import MethodBuilder
 from .classes.ClassBuilder import ClassBuilder
 from .top.TopBuilder import TopBuilder
-from .base import Processor
+from .base import Builder, Processor, SourceFile
+from .exceptions import ScanTimeout
+from .report import REPORTS
+from .cache import cache_entry
+
+_worker = None  # DYC instance of a scanning process
+
+
+def _init_worker(config):
+    """
+    Sets up the DYC instance of a scanning process, so that formats
+    are compiled once per process and not once per file
+    Parameters
+    ----------
+    dict config: Plain configuration of the run
+    """
+    global _worker
+    _worker = DYC(config, placeholders=True)
+    _worker.prepare_formats()
+
+
+def _scan_worker(filename):
+    """
+    Scans and formats a file with placeholders in a scanning process.
+    Output is captured and sent back with the result so that it is
+    printed in file order. A file left as it is is sent back as its
+    cache entry rather than its text
+    Parameters
+    ----------
+    str filename: path of the file
+    """
+    output = io.StringIO()
+    text = None
+    entry = None
+    with contextlib.redirect_stdout(output):
+        source = _worker.scan_file(filename)
+        if source is not None and source.changed:
+            text = source.render()
+        elif source is not None:
+            fmt = _worker.formats.get(get_extension(filename))
+            findings = _worker.findings(filename, fmt, source)
+            entry = cache_entry(filename, source.text, findings)
+    return filename, output.getvalue(), text, entry, source is None
+
 
 class DYC(Processor):
-    def __init__(self, config, details=None, placeholders=False):
+    def __init__(
+        self, config, details=None, placeholders=False, formats=None, cache=None
+    ):
         self.config = config
         self.placeholders = placeholders
+        self.skipped = []
+        self.cache = cache
+        if formats:
+            self.formats = formats
         
-    def document(self):
+    def document(self, jobs=1):
        print("\nStarting Documentation \n\r")
+       if jobs > 1 and self.placeholders:
+           self.document_parallel(jobs)
+           self.save_cache()
+           return
        for filename in self.file_list:
+            if self.is_clean(filename):
+                continue
             add_file = click.confirm(
                     "Do you want to document file {}?".format(
                         click.style(filename, fg="green")))
             if (add_file):
-               self.process_top(filename)
-               self.process_classes(filename)
-               self.process_methods(filename)
-		         
+               self.process_file(filename)
+       self.save_cache()
+       self.report_skipped()
+
+    def document_parallel(self, jobs):
+        """
+        Documents files with placeholders over a pool of processes.
+        Files are confirmed first, then scanned and formatted in
+        parallel. Results come back in file order and every file is
+        written once, by this process only. Files left as they are go
+        into the scan cache
+        Parameters
+        ----------
+        int jobs: Number of scanning processes
+        """
+        files = [
+            filename
+            for filename in self.file_list
+            if not self.is_clean(filename)
+            and click.confirm(
+                "Do you want to document file {}?".format(
+                    click.style(filename, fg="green")
+                )
+            )
+        ]
+        if not files:
+            return
+        chunksize = max(1, min(64, len(files) // (jobs * 4)))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(self.config,)
+        ) as executor:
+            for filename, output, text, entry, skipped in executor.map(
+                _scan_worker, files, chunksize=chunksize
+            ):
+                sys.stdout.write(output)
+                if skipped:
+                    self.skipped.append(filename)
+                elif text is not None:
+                    with open(filename, "w") as stream:
+                        stream.write(text)
+                elif self.cache is not None:
+                    self.cache.put_entry(filename, entry)
+        self.report_skipped()
+
+    def check(self, changes=None):
+        """
+        Runs the detection of every builder over the files, without
+        prompting or writing, and returns the undocumented tops,
+        classes and methods found
+        Parameters
+        ----------
+        dict changes: Changes of a diff keyed by path, to only report what they added
+        """
+        findings = []
+        for filename in self.file_list:
+            change = changes.get(filename) if changes else None
+            findings.extend(self.check_file(filename, change=change))
+        self.save_cache()
+        return findings
+
+    def save_cache(self):
+        """
+        Stores the scan cache of the run, if there is one
+        """
+        if self.cache is not None:
+            self.cache.save()
+
+    def check_file(self, filename, change=None):
+        """
+        Returns the undocumented tops, classes and methods of a file,
+        with their line and column. Files going over the scan budget
+        are added to the skipped files instead
+        Parameters
+        ----------
+        str filename: path of the file
+        dict change: Change of the file from a diff, if any. Findings
+            depend on it, so the scan cache is not used
+        """
+        fmt = self.formats.get(get_extension(filename))
+        if fmt is None:
+            return []
+        cache = self.cache if change is None else None
+        if cache is not None:
+            cached = cache.get(filename)
+            if cached is not None:
+                return cached
+        source = self.source(filename, fmt)
+        try:
+            findings = self.findings(filename, fmt, source, change=change)
+        except ScanTimeout:
+            self.skipped.append(filename)
+            return []
+        if cache is not None:
+            cache.put(filename, source.text, findings)
+        return findings
+
+    def is_clean(self, filename):
+        """
+        Tells from the scan cache that a file has nothing to document,
+        so that it is skipped without being read
+        Parameters
+        ----------
+        str filename: path of the file
+        """
+        return self.cache is not None and self.cache.get(filename) == []
+
+    def findings(self, filename, fmt, source, change=None):
+        """
+        Runs the detection of the top, class and method builders on a
+        buffer and returns the undocumented candidates as findings
+        Parameters
+        ----------
+        str filename: path of the file
+        FormatSpec fmt: Compiled format of the file
+        SourceFile source: Buffer of the file
+        dict change: Change of the file from a diff, if any
+        """
+        builders = (
+            TopBuilder(filename, fmt.top, source=source),
+            ClassBuilder(filename, fmt.cls, source=source),
+            MethodBuilder(filename, fmt.method, source=source),
+        )
+        findings = []
+        for builder in builders:
+            for candidate in builder.candidates(change=change):
+                line, column = source.lines.position(candidate.start)
+                findings.append(
+                    {
+                        "path": filename,
+                        "line": line,
+                        "column": column + 1,
+                        "kind": candidate.kind,
+                        "name": candidate.name,
+                    }
+                )
+        return findings
+
+    def report_skipped(self):
+        """
+        Lists the files that were skipped for going over the scan budget
+        """
+        if not self.skipped:
+            return
+        click.echo(
+            click.style(
+                "\n{} file(s) skipped, scanning took longer than {} seconds:".format(
+                    len(self.skipped), self.config.get("scan_budget")
+                ),
+                fg="red",
+            )
+        )
+        for filename in self.skipped:
+            click.echo(filename)
+
+    def source(self, filename, fmt):
+        """
+        Creates the buffer of a file with the engine of its format and
+        the scan budget of the run
+        Parameters
+        ----------
+        str filename: path of the file
+        FormatSpec fmt: Compiled format of the file
+        """
+        return SourceFile(
+            filename, engine=fmt.get("engine"), budget=self.config.get("scan_budget")
+        )
+
+    def process_file(self, filename, diff_only=False, changes=None):
+        """
+        Documents the top, classes and methods of a file. The file is
+        read once, every builder works on the same in-memory buffer
+        and the result is committed back in a single write
+        Parameters
+        ----------
+        str filename: path of the file
+        bool diff_only: Use a diff only. Consumed by dyc diff.
+        dict changes: Changes of the diff keyed by path, consumed by dyc diff.
+        """
+        source = self.scan_file(filename, diff_only=diff_only, changes=changes)
+        if source is not None:
+            source.write()
 
-    def process_methods(self, filename, diff_only=False, changes=[]):
+    def scan_file(self, filename, diff_only=False, changes=None):
+        """
+        Runs the top, classes and methods builders of a file against one
+        buffer and returns it with its pending insertions, without
+        writing. Returns None when the file went over the scan budget
+        Parameters
+        ----------
+        str filename: path of the file
+        bool diff_only: Use a diff only. Consumed by dyc diff.
+        dict changes: Changes of the diff keyed by path, consumed by dyc diff.
+        """
+        fmt = self.formats.get(get_extension(filename))
+        source = self.source(filename, fmt)
+        try:
+            self.process_top(filename, diff_only=diff_only, changes=changes, source=source)
+            self.process_classes(filename, diff_only=diff_only, changes=changes, source=source)
+            self.process_methods(filename, diff_only=diff_only, changes=changes, source=source)
+            if self.cache is not None and not source.changed and not diff_only:
+                # Nothing was added, the file is cached as it is on disk
+                self.cache.put(filename, source.text, self.findings(filename, fmt, source))
+        except ScanTimeout as e:
+            Builder.details.pop(filename, None)
+            click.echo(click.style("Skipping {}: {}".format(filename, e), fg="red"))
+            self.skipped.append(filename)
+            return None
+        return source
+
+    def process_methods(self, filename, diff_only=False, changes=None, source=None):
         """
         Main method that documents methods in a file. To any
         file that needs to be documented. Process methods is the
@@ -37,82 +301,106 @@ class DYC(Processor):
         Parameters
         ----------
         bool diff_only: Use a diff only. Consumed by dyc diff.
-        list changes: Changes in a file, mainly use also with dyc diff.
+        dict changes: Changes of the diff keyed by path, consumed by dyc diff.
+        SourceFile source: Shared buffer of the file, read and written by the caller
         """
         print("\nProcessing Methods for filename " + filename + "\n\r")
 
-        try:
-            change = list(filter(lambda x: x.get("path") == filename, changes))[0]
-        except TypeError as e:
-            click.echo(
-                click.style("Error %r: USING default settings for methods" % e, fg="red")
-            )
-            return
-        except IndexError:
-            change = None
+        change = changes.get(filename) if changes else None
 
         extension = get_extension(filename)
         fmt = self.formats.get(extension)
-        method_cnf = fmt.get("method", {})
-        method_cnf["arguments"] = fmt.get("arguments")
-        method_cnf["returns"] = fmt.get("returns")
+        method_cnf = fmt.method
         builder = MethodBuilder(
-            filename, method_cnf, placeholders=self.placeholders
+            filename,
+            method_cnf,
+            placeholders=self.placeholders,
+            source=source or self.source(filename, fmt),
         )
         builder.initialize(change=change)
         builder.prompts()
         builder.apply()
         builder.clear(filename)
+        if source is None:
+            builder.source.write()
 
-    def process_classes(self, filename, diff_only=False, changes=[]):
+    def process_classes(self, filename, diff_only=False, changes=None, source=None):
         """
         Main method that documents Classes in a file.
         """
         print("\nProcessing Classes for filename " + filename + "\n\r")
 
-        try:
-            change = list(filter(lambda x: x.get("path") == filename, changes))[0]
-        except TypeError as e:
-            click.echo(
-                click.style("Error %r: USING default settings for classes" % e, fg="red")
-            )
-            return
-        except IndexError:
-            change = None
+        change = changes.get(filename) if changes else None
 
         extension = get_extension(filename)
         fmt = self.formats.get(extension)
-        class_cnf = fmt.get("class", {})
+        class_cnf = fmt.cls
         builder = ClassBuilder(
-            filename, class_cnf, placeholders=self.placeholders
+            filename,
+            class_cnf,
+            placeholders=self.placeholders,
+            source=source or self.source(filename, fmt),
         )
         builder.initialize(change=change)
         builder.prompts()
         builder.apply()
         builder.clear(filename)
+        if source is None:
+            builder.source.write()
 
-    def process_top(self, filename, diff_only=False, changes=[]):
+    def process_top(self, filename, diff_only=False, changes=None, source=None):
         """
         Main method that documents a top of a file. Still
         """
         print("\nProcessing Top of File for filename " + filename + "\n\r")
-        try:
-            change = list(filter(lambda x: x.get("path") == filename, changes))[0]
-        except TypeError as e:
-            click.echo(
-                click.style("Error %r: USING default settings for top" % e, fg="red")
-            )
-            return
-        except IndexError:
-            change = None
+        change = changes.get(filename) if changes else None
 
         extension = get_extension(filename)
         fmt = self.formats.get(extension)
-        top_cnf = fmt.get("top", {})
+        top_cnf = fmt.top
         builder = TopBuilder(
-            filename, top_cnf, placeholders=self.placeholders
+            filename,
+            top_cnf,
+            placeholders=self.placeholders,
+            source=source or self.source(filename, fmt),
         )
         builder.initialize(change=change)
         builder.prompts()
         builder.apply()
         builder.clear(filename)
+        if source is None:
+            builder.source.write()
+
+
+def check_report(
+    config, files=(), report_format="json", changes=None, cache=None, project_files=None
+):
+    """
+    Runs `dyc check` and returns its report, along with whether anything
+    undocumented was found. The config is left untouched so that it can
+    be shared between runs, i.e by `dyc serve`
+    Parameters
+    ----------
+    ParsedConfig config: Config going to be used in DYC
+    list files: Files to check, all the files of the project when empty
+    str report_format: Name of the report i.e json or sarif
+    dict changes: Changes of a diff keyed by path, to only report what they added
+    ScanCache cache: Detection results of the previous runs
+    list project_files: Files of the project listed beforehand, i.e by
+        `dyc serve`, checked when no files are given
+    """
+    if changes is not None:
+        files = [
+            path
+            for path in (map(os.path.normpath, files) if files else changes)
+            if path in changes
+        ]
+        if not files:
+            return REPORTS[report_format]([]), False
+    plain = dict(config.plain, file_list=list(files)) if files else config.plain
+    dyc = DYC(plain, formats=config.formats, cache=cache)
+    dyc.prepare()
+    if project_files is not None and not files:
+        dyc.file_list = project_files
+    findings = dyc.check(changes=changes)
+    return REPORTS[report_format](findings, dyc.skipped), bool(findings)
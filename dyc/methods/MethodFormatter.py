@@ -4,33 +4,72 @@ the application. Here is the the place where the actual reading,
 parsing and validation of the files happens.
 """
 import sys
-import copy
 import click
-from ..utils import (
-    BlankFormatter,
-    convert_indent,
-    add_start_end,
-)
+from ..utils import add_start_end
+from ..templates import ARGUMENT, METHOD_LAYOUT, RETURNS, SECTION
 
 
-class MethodFormatter:
+class MethodFormatter(object):
 
-    formatted_string = "{doc_open}\n{break_after_open}{method_docstring}{break_after_docstring}{empty_line}{argument_format}\n{return_format}{break_before_close}\n{doc_close}"
+    # Set when the docstring is rendered
+    __slots__ = ("method_format", "argument_format", "return_format", "result")
 
-    fmt = BlankFormatter()
+    formatted_string = METHOD_LAYOUT
 
     def format(self):
         """
         Public formatting method that executes a pattern of methods to
-        complete the process
+        complete the process. Methods of the same shape are only
+        rendered once per format
+        """
+        self.result = self.config.plan.render(self.shape(), self.render)
+        self.polish()
+
+    @staticmethod
+    def format_all(interfaces):
+        """
+        Formats the docstrings of many methods of a format in one call,
+        once they were all prompted, i.e with placeholders
+        Parameters
+        ----------
+        list interfaces: Method interfaces of the same format
+        """
+        if not interfaces:
+            return
+        plan = interfaces[0].config.plan
+        results = plan.render_many(
+            (interface.shape(), interface.render) for interface in interfaces
+        )
+        for interface, result in zip(interfaces, results):
+            interface.result = result
+            interface.polish()
+
+    def shape(self):
+        """
+        Everything the docstring depends on besides the format
+        """
+        return (
+            self.method_docstring,
+            bool(self.arguments),
+            tuple(
+                (details.get("type"), details.get("doc"), details.get("name"))
+                for details in self.arg_docstring
+            ),
+            tuple(sorted(self.ret_docstring.items())),
+            self.indent,
+        )
+
+    def render(self):
+        """
+        Renders the docstring, indented but not yet confirmed
         """
         self.pre()
         self.build_docstrings()
         self.build_arguments()
         self.build_return_value()
-        self.result = self.fmt.format(self.formatted_string, **self.method_format)
+        self.result = self.config.plan.layout.render(self.method_format)
         self.add_indentation()
-        self.polish()
+        return self.result
 
     def wrap_strings(self, words):
         """
@@ -48,37 +87,12 @@ class MethodFormatter:
     def pre(self):
         """
         In the formatter, this method sets up the object that
-        will be used in a formatted way,. Also translates configs
-        into consumable values
+        will be used in a formatted way. Configs are already translated
+        into consumable values once by the compiled format spec
         """
-        method_format = copy.deepcopy(self.config)
-        method_format["indent"] = (
-             convert_indent(method_format["indent"]) if method_format["indent"] else "    "
-        )
-        method_format["indent_content"] = (
-            convert_indent(method_format["indent"])
-            if method_format["indent_content"]
-            else ""
-        )
-        method_format["break_after_open"] = (
-            "\n" if method_format["break_after_open"] else ""
-        )
-        method_format["break_after_docstring"] = (
-            "\n" if method_format["break_after_docstring"] else ""
-        )
-        method_format["break_before_close"] = (
-            "\n" if method_format["break_before_close"] else ""
-        )
-        method_format["empty_line"] = "\n"
-
-        argument_format = copy.deepcopy(self.config.get("arguments"))
-        argument_format["inline"] = "" if argument_format["inline"] else "\n"
-
-        return_format = copy.deepcopy(self.config.get("returns"))        
-
-        self.method_format = method_format
-        self.argument_format = argument_format
-        self.return_format = return_format
+        self.method_format = dict(self.config.format)
+        self.argument_format = dict(self.config.argument_format)
+        self.return_format = dict(self.config.return_format)
 
     def build_docstrings(self):
         """
@@ -98,31 +112,15 @@ class MethodFormatter:
             self.method_format["empty_line"] = ""
             return
 
-        config = self.config.get("arguments")
-        formatted_args = "{prefix} {type} {name}: {doc}"
-
-        title = self.argument_format.get("title")
-        if title:
-            underline = "-" * len(title)
-            self.argument_format["title"] = (
-                "{}\n{}\n".format(title, underline)
-                if config.get("underline")
-                else "{}\n".format(title)
-            )
-
         result = []
 
         if self.arguments:  # if len(self.arguments) > 0
             for argument_details in self.arg_docstring:
                 argument_details["prefix"] = self.argument_format.get("prefix")
-                result.append(
-                    self.fmt.format(formatted_args, **argument_details).strip()
-                )
+                result.append(ARGUMENT.render(argument_details).strip())
 
         self.argument_format["body"] = "\n".join(result)
-        self.method_format["argument_format"] = self.fmt.format(
-            "{title}{body}", **self.argument_format
-        )
+        self.method_format["argument_format"] = SECTION.render(self.argument_format)
     def build_return_value(self):
         """
         Main function for wrapping up return docstrings
@@ -135,22 +133,10 @@ class MethodFormatter:
             self.return_format["empty_line"] = ""
             return
 
-        formatted_returns = "{prefix} {type} : {doc}"
-
-        title = self.return_format.get("return_title")
-        if title:
-            underline = "-" * len(title)
-            self.return_format["title"] = (
-                "{}\n{}\n".format(title, underline)
-                if config.get("return_underline")
-                else "{}\n".format(title)
-            )
         self.ret_docstring["prefix"] = self.return_format.get("prefix")
-        result = self.fmt.format(formatted_returns, **self.ret_docstring).strip()
+        result = RETURNS.render(self.ret_docstring).strip()
         self.return_format["body"] = result
-        self.method_format["return_format"] = self.fmt.format(
-            "{title}{body}", **self.return_format
-        )
+        self.method_format["return_format"] = SECTION.render(self.return_format)
 
     def add_indentation(self):
         """
@@ -204,6 +190,6 @@ class MethodFormatter:
         docstring = self.result.split("\n")
         polished = "\n".join([self.leading_space + docline for docline in docstring])
         if self.placeholders:
-            self.result = polished
+            self.result = polished + "\n"
         else:
             self.confirm(polished)
@@ -8,9 +8,28 @@ from .MethodFormatter import MethodFormatter
 
 
 class MethodInterface(MethodFormatter):
+    """
+    Undocumented method of a file. Only its offsets in the file are
+    kept, the prompted docstrings are set once it is prompted for
+    """
+
+    __slots__ = (
+        "name",
+        "start",
+        "end",
+        "indent",
+        "filename",
+        "arguments",
+        "config",
+        "leading_space",
+        "placeholders",
+        "method_docstring",
+        "arg_docstring",
+        "ret_docstring",
+    )
+
     def __init__(
         self,
-        plain,
         name,
         start,
         end,
@@ -21,16 +40,12 @@ class MethodInterface(MethodFormatter):
         leading_space,
         placeholders,
     ):
-        self.plain = plain
         self.name = name
         self.start = start
         self.end = end
         self.indent = indent
         self.filename = filename
         self.arguments = arguments
-        self.method_docstring = ""
-        self.arg_docstring = []
-        self.ret_docstring = dict()
         self.config = config
         self.leading_space = leading_space
         self.placeholders = placeholders
@@ -40,10 +55,19 @@ class MethodInterface(MethodFormatter):
         Wrapper method for prompts and calls for prompting args and
         methods then formats them
         """
+        self.collect()
+        self.format()
+
+    def collect(self):
+        """
+        Prompts for the docstrings of the method, its arguments and its
+        return value, without formatting them
+        """
+        self.arg_docstring = []
+        self.ret_docstring = dict()
         self._prompt_docstring()
         self._prompt_args()
         self._prompt_return()
-        self.format()
 
     def _prompt_docstring(self):
         """
@@ -79,6 +103,7 @@ class MethodInterface(MethodFormatter):
                 else doc_placeholder
             )
             show_arg_type = self.config.get("arguments", {}).get("add_type", False)
+            arg_type = ""
             if show_arg_type:
                 arg_placeholder = "<type>"
                 arg_type = (
@@ -105,7 +130,7 @@ class MethodInterface(MethodFormatter):
             ret_type = (
                 click.prompt("({}) Argument type ".format(echo_name))
                 if not self.placeholders
-                else arg_placeholder
+                else ret_placeholder
             )
 
         self.ret_docstring = dict(type=ret_type, doc=ret_doc)
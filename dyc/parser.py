@@ -6,18 +6,63 @@ It parses all the configs to be consumed in DYC.
 """
 import copy
 import click
-from .configs import Config
+from .configs import Config, DEFAULT, CUSTOM
+from .cache import ConfigCache
+from .configs.spec import compile_formats
 
 
 class ParsedConfig(Config):
+    """
+    Config of a run. `dyc.yaml` is only read, and the formats compiled,
+    when a command first uses them. The merged config is cached until
+    `defaults.yaml` or `dyc.yaml` change
+    """
+
     def __init__(self):
-        self.plain = copy.deepcopy(self.default)
+        self._plain = None
+        self._formats = None
+
+    @property
+    def plain(self):
+        """
+        Defaults merged with the settings of `dyc.yaml`
+        """
+        if self._plain is None:
+            cache = ConfigCache([DEFAULT, CUSTOM])
+            stored = cache.get()
+            if stored is None:
+                plain, custom = self.merge()
+                stored = dict(plain=plain, custom=custom)
+                if stored['plain'].get('cache'):
+                    cache.put(stored)
+            self._plain = stored['plain']
+            if not stored['custom']:
+                click.echo(
+                    click.style(
+                        '`dyc.yaml` Missing or Incorrectly formatted. USING default settings',
+                        fg='cyan',
+                    ),
+                    err=True,
+                )
+        return self._plain
+
+    def merge(self):
+        """
+        Merges the settings of `dyc.yaml` into a copy of the defaults.
+        Returns them along with whether `dyc.yaml` could be used
+        """
+        self._plain = copy.deepcopy(self.default)
         try:
             self.override()
         except AttributeError:
-            click.echo(
-                click.style(
-                    '`dyc.yaml` Missing or Incorrectly formatted. USING default settings',
-                    fg='cyan',
-                )
-            )
+            return self._plain, False
+        return self._plain, True
+
+    @property
+    def formats(self):
+        """
+        Compiled formats keyed by extension
+        """
+        if self._formats is None:
+            self._formats = compile_formats(self.plain.get('formats'))
+        return self._formats
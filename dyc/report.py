@@ -0,0 +1,134 @@
+"""
+Machine-readable reports of `dyc check`. Findings are plain dicts with
+the path, line, column, kind and name of an undocumented top, class
+or method, reported as JSON or as SARIF for code scanning tools.
+"""
+import os
+import json
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+INFORMATION_URI = "https://github.com/Zarad1993/dyc"
+RULES = {
+    "top": "Top of file is not documented",
+    "class": "Class is not documented",
+    "method": "Method is not documented",
+}
+
+
+def rule_id(kind):
+    """
+    Returns the rule of a kind of finding i.e undocumented-method
+    Parameters
+    ----------
+    str kind: top, class or method
+    """
+    return "undocumented-{}".format(kind)
+
+
+def json_report(findings, skipped=()):
+    """
+    Builds the JSON report of a check. Paths are relative to the
+    working directory, as in the SARIF report, whatever way the files
+    were found
+    Parameters
+    ----------
+    list findings: Undocumented tops, classes and methods
+    list skipped: Files skipped for going over the scan budget
+    """
+    summary = dict((kind, 0) for kind in RULES)
+    for finding in findings:
+        summary[finding["kind"]] += 1
+    return json.dumps(
+        {
+            "total": len(findings),
+            "summary": summary,
+            "findings": [
+                dict(finding, path=to_uri(finding["path"])) for finding in findings
+            ],
+            "skipped": [to_uri(path) for path in skipped],
+        },
+        indent=2,
+    )
+
+
+def sarif_report(findings, skipped=()):
+    """
+    Builds the SARIF 2.1.0 report of a check. Skipped files are
+    reported as tool notifications
+    Parameters
+    ----------
+    list findings: Undocumented tops, classes and methods
+    list skipped: Files skipped for going over the scan budget
+    """
+    rules = [
+        {"id": rule_id(kind), "shortDescription": {"text": text}}
+        for kind, text in RULES.items()
+    ]
+    results = [
+        {
+            "ruleId": rule_id(finding["kind"]),
+            "level": "warning",
+            "message": {
+                "text": "{} `{}` is not documented".format(
+                    finding["kind"].capitalize(), finding["name"]
+                )
+            },
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": to_uri(finding["path"])},
+                        "region": {
+                            "startLine": finding["line"],
+                            "startColumn": finding["column"],
+                        },
+                    }
+                }
+            ],
+        }
+        for finding in findings
+    ]
+    notifications = [
+        {
+            "level": "warning",
+            "message": {"text": "Skipped, scanning took longer than the budget"},
+            "locations": [
+                {"physicalLocation": {"artifactLocation": {"uri": to_uri(path)}}}
+            ],
+        }
+        for path in skipped
+    ]
+    run = {
+        "tool": {
+            "driver": {
+                "name": "dyc",
+                "informationUri": INFORMATION_URI,
+                "rules": rules,
+            }
+        },
+        "results": results,
+    }
+    if notifications:
+        run["invocations"] = [
+            {"executionSuccessful": True, "toolExecutionNotifications": notifications}
+        ]
+    return json.dumps(
+        {"$schema": SARIF_SCHEMA, "version": SARIF_VERSION, "runs": [run]}, indent=2
+    )
+
+
+def to_uri(path):
+    """
+    Turns a path into a relative URI when it is under the working
+    directory, as SARIF viewers resolve them against the repository root
+    Parameters
+    ----------
+    str path: path of a file
+    """
+    relative = os.path.relpath(os.path.abspath(path))
+    if relative.startswith(os.pardir):
+        relative = os.path.abspath(path)
+    return relative.replace(os.sep, "/")
+
+
+REPORTS = {"json": json_report, "sarif": sarif_report}
@@ -0,0 +1,264 @@
+"""
+`dyc serve` keeps a project warm between commands. The config with its
+compiled formats, the scan cache and the handle of the repository are
+set up once, and requests of `dyc check` are answered over a Unix
+socket instead of starting over.
+
+The files of the project are listed once too, and again only when the
+git index or a directory holding them changed.
+
+Every request is a line of JSON-RPC 2.0, answered by another line:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "check", "params": {"files": []}}
+    {"jsonrpc": "2.0", "id": 1, "result": {"report": "...", "failed": true}}
+
+The server stops once `dyc.yaml` changed, as its config is stale. The
+request that noticed it gets a STALE error and runs on its own.
+"""
+import os
+import json
+import threading
+import subprocess
+import socketserver
+from git.exc import GitCommandError
+from .configs import CUSTOM
+from .diff import Diff
+from .main import DYC, check_report
+from .report import REPORTS
+from .cache import open_cache
+from .client import FAILED, STALE, SOCKET_PATH, request
+from .exceptions import ServerError
+from .utils import signature
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+def git_index(root):
+    """
+    Path of the git index of the checkout holding a directory, None
+    outside of one
+    Parameters
+    ----------
+    str root: Directory of the project
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "--git-path", "index"],
+            cwd=root,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return os.path.join(root, os.fsdecode(output).strip())
+
+
+class ProjectFiles(object):
+    """
+    Files of the project kept between requests. They are only listed
+    again once the git index, or one of the directories they were found
+    in, changed, i.e a file was added, staged, removed or renamed
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.index = git_index(os.getcwd())
+        self.files = None
+        self.directories = ()
+        self.key = None
+
+    def state(self):
+        """
+        Signatures of the git index and of the directories of the files
+        """
+        index = signature(self.index) if self.index else None
+        return index, [signature(directory) for directory in self.directories]
+
+    def get(self):
+        """
+        Returns the files of the project, listed again when needed
+        """
+        if self.files is not None and self.state() == self.key:
+            return self.files
+        dyc = DYC(self.config.plain, formats=self.config.formats)
+        dyc.prepare()
+        root = dyc.walker.root
+        directories = set([root])
+        files = []
+        for path in dyc.file_list:
+            files.append(path)
+            directory = os.path.dirname(path)
+            # Parents hold the directories that new files may come in
+            while directory not in directories and directory.startswith(root):
+                directories.add(directory)
+                directory = os.path.dirname(directory)
+        self.files = files
+        self.directories = sorted(directories)
+        self.key = self.state()
+        return self.files
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        """
+        Answers the requests of a connection, one per line
+        """
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.respond(line)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class DYCServer(socketserver.UnixStreamServer):
+    """
+    Unix socket server of a project. Requests are answered one at a
+    time, as the builders keep their state at class level
+    """
+
+    def __init__(self, config, path=SOCKET_PATH):
+        self.config = config
+        self.path = path
+        self.custom = signature(CUSTOM)
+        self.cache = open_cache(config.plain)
+        self.diff = None  # Repository handle, set up by the first --base
+        self.files = ProjectFiles(config)
+        self.methods = {"check": self.check, "ping": self.ping, "stop": self.stop}
+        self.prepare_socket()
+        socketserver.UnixStreamServer.__init__(self, path, RequestHandler)
+
+    def prepare_socket(self):
+        """
+        Makes room for the socket. A socket left behind by a server that
+        is gone is removed, a live server is an error
+        """
+        try:
+            alive = request("ping", path=self.path) is not None
+        except ServerError:
+            alive = True
+        if alive:
+            raise ServerError(FAILED, "dyc serve is already running")
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+            with open(os.path.join(directory, ".gitignore"), "w") as stream:
+                stream.write("*\n")
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def server_close(self):
+        """
+        Closes the socket and removes its file
+        """
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def respond(self, line):
+        """
+        Runs a request and builds its response
+        Parameters
+        ----------
+        bytes line: JSON-RPC request
+        """
+        try:
+            message = json.loads(line.decode("utf-8"))
+        except ValueError:
+            return self.error(None, PARSE_ERROR, "Parse error")
+        if not isinstance(message, dict) or "method" not in message:
+            return self.error(None, INVALID_REQUEST, "Invalid request")
+        identifier = message.get("id")
+        method = self.methods.get(message["method"])
+        if method is None:
+            return self.error(identifier, METHOD_NOT_FOUND, "Method not found")
+        params = message.get("params") or {}
+        if not isinstance(params, dict):
+            return self.error(identifier, INVALID_PARAMS, "Invalid params")
+        if signature(CUSTOM) != self.custom:
+            self.stop()
+            return self.error(identifier, STALE, "dyc.yaml changed, restart dyc serve")
+        try:
+            result = method(**params)
+        except TypeError as e:
+            return self.error(identifier, INVALID_PARAMS, str(e))
+        except ServerError as e:
+            return self.error(identifier, e.code, str(e))
+        return {"jsonrpc": "2.0", "id": identifier, "result": result}
+
+    def error(self, identifier, code, message):
+        """
+        Builds an error response
+        Parameters
+        ----------
+        int identifier: Id of the request
+        int code: JSON-RPC code of the error
+        str message: Description of the error
+        """
+        return {
+            "jsonrpc": "2.0",
+            "id": identifier,
+            "error": {"code": code, "message": message},
+        }
+
+    def check(self, files=(), format="json", base=None, no_cache=False):
+        """
+        Runs `dyc check` with the warm config, cache and repository
+        Parameters
+        ----------
+        list files: Files to check, all the files of the project when empty
+        str format: Name of the report i.e json or sarif
+        str base: Only report what was added since the merge base with this ref
+        bool no_cache: Scan every file from scratch
+        """
+        if format not in REPORTS:
+            raise ServerError(INVALID_PARAMS, "Unknown format {}".format(format))
+        changes = None
+        if base:
+            try:
+                if self.diff is None:
+                    self.diff = Diff(self.config.plain)
+                self.diff.base = base
+                changes = self.diff.uncommitted
+            except GitCommandError as e:
+                message = '{} ({})'.format(base, (e.stderr or '').strip())
+                raise ServerError(FAILED, message)
+        report, failed = check_report(
+            self.config,
+            files=files,
+            report_format=format,
+            changes=changes,
+            cache=None if no_cache else self.cache,
+            project_files=None if files or changes is not None else self.files.get(),
+        )
+        return {"report": report, "failed": failed}
+
+    def ping(self):
+        """
+        Tells that the server is up, with its process id
+        """
+        return {"pid": os.getpid()}
+
+    def stop(self):
+        """
+        Stops serving once the current request is answered
+        """
+        threading.Thread(target=self.shutdown).start()
+        return {"pid": os.getpid()}
+
+
+def start_server(config, path=SOCKET_PATH):
+    """
+    Serves a project until it is stopped or its config changed
+    Parameters
+    ----------
+    ParsedConfig config: Config going to be used in DYC
+    str path: Path of the Unix socket
+    """
+    server = DYCServer(config, path=path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,132 @@
+"""
+Docstring templates, parsed once instead of for every docstring.
+
+A Template is split into its literal text and fields a single time. A
+DocstringPlan binds the layout of a section to the values of its
+format when the format is compiled, so that only the text of a
+docstring is left to fill in, and keeps the docstrings it rendered.
+"""
+import string
+
+METHOD_LAYOUT = "{doc_open}\n{break_after_open}{method_docstring}{break_after_docstring}{empty_line}{argument_format}\n{return_format}{break_before_close}\n{doc_close}"
+CLASS_LAYOUT = "{doc_open}\n{break_after_open}{class_docstring}{break_after_docstring}{empty_line}{break_before_close}\n{doc_close}"
+TOP_LAYOUT = "{doc_open}{break_after_open}{top_docstring}{break_after_docstring}{break_before_close}{doc_close}"
+
+# Fields of the layouts that change from one docstring to the next
+METHOD_FIELDS = (
+    "method_docstring",
+    "argument_format",
+    "return_format",
+    "break_before_close",
+    "empty_line",
+)
+CLASS_FIELDS = ("class_docstring",)
+TOP_FIELDS = ("top_docstring",)
+
+MEMO_SIZE = 4096  # Rendered docstrings kept per plan
+
+
+class Template(object):
+    """
+    Format string parsed into literal text and fields. Missing fields
+    render blank, as with BlankFormatter
+    """
+
+    def __init__(self, text, parts=None):
+        self.text = text
+        if parts is None:
+            parts = [
+                (literal, field, conversion, spec or "")
+                for literal, field, conversion, spec in string.Formatter().parse(text)
+            ]
+        self.parts = parts
+
+    def render(self, values):
+        """
+        Fills the fields in
+        Parameters
+        ----------
+        dict values: Values of the fields
+        """
+        result = []
+        for literal, field, conversion, spec in self.parts:
+            result.append(literal)
+            if field is None:
+                continue
+            value = values.get(field, "")
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            if spec or type(value) is not str:
+                value = format(value, spec)
+            result.append(value)
+        return "".join(result)
+
+    def bind(self, values, keep=()):
+        """
+        Returns a template with every field but the kept ones filled in
+        Parameters
+        ----------
+        dict values: Values of the fields
+        tuple keep: Fields left to fill in later
+        """
+        parts = []
+        literal = ""
+        for text, field, conversion, spec in self.parts:
+            literal += text
+            if field is None:
+                continue
+            if field in keep:
+                parts.append((literal, field, conversion, spec))
+                literal = ""
+            else:
+                literal += Template("", [("", field, conversion, spec)]).render(values)
+        if literal:
+            parts.append((literal, None, None, ""))
+        return Template(self.text, parts)
+
+
+ARGUMENT = Template("{prefix} {type} {name}: {doc}")
+RETURNS = Template("{prefix} {type} : {doc}")
+SECTION = Template("{title}{body}")
+
+
+class DocstringPlan(object):
+    """
+    Render plan of the docstrings of a section of a format. The layout
+    is bound to the values of the format, and rendered docstrings are
+    kept by shape, i.e the docstring text, arguments and indent
+    """
+
+    def __init__(self, layout, values, fields):
+        self.layout = Template(layout).bind(values, keep=fields)
+        self.memo = {}
+
+    def render(self, shape, build):
+        """
+        Returns the docstring of a shape, only built the first time
+        Parameters
+        ----------
+        tuple shape: Everything the docstring depends on besides the format
+        callable build: Builds the docstring
+        """
+        result = self.memo.get(shape)
+        if result is None:
+            result = build()
+            if len(self.memo) >= MEMO_SIZE:
+                self.memo.clear()
+            self.memo[shape] = result
+        return result
+
+    def render_many(self, items):
+        """
+        Renders many docstrings in one call. Docstrings sharing a shape
+        are only built once
+        Parameters
+        ----------
+        iterable items: Pairs of a shape and the callable building its docstring
+        """
+        return [self.render(shape, build) for shape, build in items]
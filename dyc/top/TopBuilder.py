@@ -5,41 +5,46 @@ parsing and validation of the files happens.
 """
 from ..base import Builder
 from .TopInterface import TopInterface
-import re
+from ..engines.Candidate import Candidate
 import click
 import os
 class TopBuilder(Builder):
     already_printed_filepaths = []
 
 
+    def candidates(self, change=None):
+        """
+        Yields the top of the file when it is enabled and not documented yet.
+        In diff mode it is only kept when the first line was added, as
+        in a new file
+        Parameters
+        ----------
+        dict change: Change of the file from a diff, if any
+        """
+        if not self.config.get("enabled"):
+            return
+        if change and 1 not in change.get("additions"):
+            return
+        if not self.source.scanner.top(self.config):
+            yield Candidate("top", os.path.basename(self.filename), 0, 0, "")
+
     def initialize(self, change=None):
         
         if not self.config.get("enabled"):
             return
-        patches = []
-        if change:
-            patches = change.get("additions")
-        with open(self.filename, 'r') as file:
-            file_lines = file.read()
-            doc_open = self.config.get("doc_open")
-            regex = re.compile("^(.*?)"+"("+re.escape(doc_open)+")",flags=re.DOTALL|re.MULTILINE)
-            match_list = list(regex.finditer(file_lines))
-            top_already_doced = False
-            if len(match_list) > 0:
-                top_already_doced = match_list[0].group(1).isspace() or match_list[0].group(1) == ""
-            
-            if not self.details.get(self.filename):
-                self.details[self.filename] = dict()
 
-            if not top_already_doced:
-                result = TopInterface(
-                        filename=self.filename,
-                        config=self.config,
-                        placeholders=self.placeholders,
-                    )
+        if not self.details.get(self.filename):
+            self.details[self.filename] = dict()
+
+        for candidate in self.candidates(change=change):
+            result = TopInterface(
+                    filename=self.filename,
+                    config=self.config,
+                    placeholders=self.placeholders,
+                )
 
-                if self.validate(result):
-                    self.details[self.filename] = result
+            if self.validate(result):
+                self.details[self.filename] = result
 
     def validate(self, result):
         """
@@ -67,19 +72,14 @@ class TopBuilder(Builder):
         """
         Abstract prompt method in builder to execute prompts over candidates
         """
-        self.details[self.filename].prompt() if self.details[self.filename] else None
+        self.details[self.filename].prompt() if self.details.get(self.filename) else None
 
     def apply(self):
         """
         Over here we are looping over the result of the
-        chosen top to document and applying the changes to the
-        files as confirmed
+        chosen top to document and queueing the change on the
+        source buffer as confirmed
         """
-        if not self.details[self.filename]:
+        if not self.details.get(self.filename):
             return
-        with open(self.filename, 'r+') as file_handle:
-            file_text = file_handle.read()
-            file_handle.seek(0)
-            file_handle.write(self.details[self.filename].result + file_text)
-
- 
+        self.source.insert(0, self.details[self.filename].result)
@@ -4,29 +4,42 @@ the application. Here is the the place where the actual reading,
 parsing and validation of the files happens.
 """
 import sys
-import copy
 import click
-from ..utils import (
-    BlankFormatter,
-    convert_indent,
-    add_start_end,
-)
+from ..utils import add_start_end
+from ..templates import TOP_LAYOUT
 
 
-class TopFormatter:
-    formatted_string = "{doc_open}{break_after_open}{top_docstring}{break_after_docstring}{break_before_close}{doc_close}"
-    fmt = BlankFormatter()
+class TopFormatter(object):
+
+    # Set when the docstring is rendered
+    __slots__ = ("top_format", "result")
+
+    formatted_string = TOP_LAYOUT
 
     def format(self):
         """
         Public formatting method that executes a pattern of methods to
-        complete the process
+        complete the process. Docstrings that come out the same are
+        only rendered once per format
+        """
+        self.result = self.config.plan.render(self.shape(), self.render)
+        self.polish()
+
+    def shape(self):
+        """
+        Everything the docstring depends on besides the format
+        """
+        return (self.top_docstring,)
+
+    def render(self):
+        """
+        Renders the docstring, indented but not yet confirmed
         """
         self.pre()
         self.build_docstrings()
-        self.result = self.fmt.format(self.formatted_string, **self.top_format)
+        self.result = self.config.plan.layout.render(self.top_format)
         self.add_indentation()
-        self.polish()
+        return self.result
 
     def wrap_strings(self, words):
         """
@@ -44,30 +57,10 @@ class TopFormatter:
     def pre(self):
         """
         In the formatter, this method sets up the object that
-        will be used in a formatted way,. Also translates configs
-        into consumable values
-        """
-        top_format = copy.deepcopy(self.config)
-        top_format["indent"] = (
-            convert_indent(top_format["indent"]) if top_format["indent"] else "    "
-        )
-        top_format["indent_content"] = (
-            convert_indent(top_format["indent"])
-            if top_format["indent_content"]
-            else ""
-        )
-        top_format["break_after_open"] = (
-            "\n" if top_format["break_after_open"] else ""
-        )
-        top_format["break_after_docstring"] = (
-            "\n" if top_format["break_after_docstring"] else ""
-        )
-        top_format["break_before_close"] = (
-            "\n" if top_format["break_before_close"] else ""
-        )
-        top_format["empty_line"] = "\n"
-
-        self.top_format = top_format
+        will be used in a formatted way. Configs are already translated
+        into consumable values once by the compiled format spec
+        """
+        self.top_format = dict(self.config.format)
 
     def build_docstrings(self):
         """
@@ -134,6 +127,6 @@ class TopFormatter:
         docstring = self.result.split("\n")
         polished = "\n".join([docline for docline in docstring])
         if self.placeholders:
-            self.result = polished
+            self.result = polished + "\n"
         else:
             self.confirm(polished)
@@ -8,6 +8,9 @@ from .TopFormatter import TopFormatter
 
 
 class TopInterface(TopFormatter):
+
+    __slots__ = ("filename", "config", "placeholders", "top_docstring")
+
     def __init__(
         self,
         filename,
@@ -15,7 +18,6 @@ class TopInterface(TopFormatter):
         placeholders,
     ):
         self.filename = filename
-        self.top_docstring = ""
         self.config = config
         self.placeholders = placeholders
 
@@ -2,13 +2,18 @@
 Reusable methods throughout DYC
 """
 import os
-import yaml
+import re
 import string
+from array import array
+from bisect import bisect_right
 
 INDENT_OPTIONS = {"tab": "\t", "2 spaces": "  ", "False": ""}
 
 
-def get_leading_whitespace(s):
+LEADING_WHITESPACE = re.compile(r"[ \t\v\f]*")  # not including \r\n
+
+
+def get_leading_whitespace(s, start=0, end=None):
     """
     Gets the leading whitespace of a string. Mainly used to
     determine how many space were there originally before adding a
@@ -17,14 +22,10 @@ def get_leading_whitespace(s):
     Parameters
     ----------
     str s: String text
+    int start: Offset to look from, so that a match is not copied out of a file
+    int end: Offset to stop at
     """
-    accumulator = []
-    for c in s:
-        if c in " \t\v\f": #not including \r\n
-            accumulator.append(c)
-        else:
-            break
-    return "".join(accumulator)
+    return LEADING_WHITESPACE.match(s, start, len(s) if end is None else end).group()
 
 
 def read_yaml(path):
@@ -34,10 +35,14 @@ def read_yaml(path):
     ----------
     str path: path of file
     """
+    import yaml  # Only loaded along with a config, it is slow to import
+
+    # The libyaml loader is much faster when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
         with open(path, "r") as config:
             try:
-                return yaml.safe_load(config)
+                return yaml.load(config, Loader=loader)
             except yaml.YAMLError as exc:
                 return None
     except IOError as io_err:
@@ -73,7 +78,9 @@ def get_indent_forward(lines,start_index):
     running_space = ""
     for i in range(start_index,len(lines)):
         if(lines[i] == "\n"):
+            # Blank line, the indent is the one of the next line
             running_space = ""
+            continue
         elif(not lines[i].isspace()):
             break
         running_space += lines[i]
@@ -100,24 +107,6 @@ def get_extension(filename):
         return ""
 
 
-def all_files_generator(extensions=[]):
-    """
-    A generator that yields all candidate files to add docstrings
-    on
-    Parameters
-    ----------
-    list extensions: Allowed extensions on a file
-    """
-    for root, dirs, files in os.walk(os.getcwd()):
-        files = [os.path.join(root, f) for f in files if not f[0] == "."]
-        dirs[:] = [d for d in dirs if not d[0] == "."]
-        if extensions:
-            files = [
-                filename for filename in files if get_extension(filename) in extensions
-            ]
-        yield files
-
-
 def add_start_end(string):
     """
     Utility method add the START and END for a docstring
@@ -147,35 +136,104 @@ def get_file_lines(name):
     return lines
 
 
-def get_hunk(patch):
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def signature(path):
     """
-    Gets the hunk of a patch from the diff pattern
+    Modification time and size of a file, None when it cannot be read
     Parameters
     ----------
-    str patch: Diff patched text
+    str path: Path of a file
     """
-    import re
-
-    pat = r".*?\@\@(.*)\@\@.*"
-    match = re.findall(pat, patch)
-    return [m.strip() for m in match]
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
 
-def get_additions_in_first_hunk(hunk):
+def parse_hunk_header(line):
     """
-    Pulls the additions from a hunk of a diff patch
+    Reads the line ranges of a hunk header i.e `@@ -10,2 +11,3 @@`.
+    A count left out of the header is 1. Returns None when the line is
+    not a hunk header
     Parameters
     ----------
-    str hunk: Git diff Hunk
+    str line: Line of a diff
+    """
+    match = HUNK_HEADER.match(line)
+    if not match:
+        return None
+    old_start, old_count, new_start, new_count = match.groups()
+    return (
+        int(old_start),
+        int(old_count) if old_count is not None else 1,
+        int(new_start),
+        int(new_count) if new_count is not None else 1,
+    )
+
+
+class HunkIndex(object):
+    """
+    Index of the lines added to a file by a patch. The added line
+    numbers are kept as sorted runs of consecutive lines, so that the
+    index stays compact whatever the size of the patch, and a span of
+    lines is checked with a binary search instead of walking every hunk
     """
-    if not isinstance(hunk, list):
-        return None, None
-    if len(hunk) < 1:
-        return None, None
-    adds_patch = hunk[0].split("+")[-1].split(",")
-    start = int(adds_patch[0])
-    end = int(start) + int(adds_patch[1])
-    return start, end
+
+    def __init__(self, lines=()):
+        self.starts = array("l")
+        self.ends = array("l")
+        for lineno in sorted(set(lines)):
+            self.add(lineno)
+
+    def add(self, lineno, count=1):
+        """
+        Adds a run of line numbers. Runs have to be added in increasing
+        order, as a diff lists them
+        Parameters
+        ----------
+        int lineno: First added line number
+        int count: Number of consecutive added lines
+        """
+        if count < 1:
+            return
+        last = lineno + count - 1
+        if len(self.ends) and self.ends[-1] >= lineno - 1:
+            self.ends[-1] = max(self.ends[-1], last)
+        else:
+            self.starts.append(lineno)
+            self.ends.append(last)
+
+    @property
+    def lines(self):
+        """
+        All the added line numbers
+        """
+        return frozenset(
+            lineno
+            for start, end in zip(self.starts, self.ends)
+            for lineno in range(start, end + 1)
+        )
+
+    def __len__(self):
+        return sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    def __contains__(self, lineno):
+        return self.overlaps(lineno, lineno)
+
+    def overlaps(self, first, last):
+        """
+        Checks if any line between first and last (both included)
+        was added
+        Parameters
+        ----------
+        int first: First line number
+        int last: Last line number
+        """
+        index = bisect_right(self.starts, last) - 1
+        return index >= 0 and self.ends[index] >= first
 
 
 def is_one_line_method(line, keywords):
@@ -203,23 +261,51 @@ def is_comment(line, comments):
     list comments: A list of potential comment keywords
     """
     return line.lstrip(' ')[0] in comments
-def count_lines(self, lines, start_index):
-    """
-    A utility method to number of line between an beginning of string and index
 
-    Parameters
-    ----------
-    str lines: The line string 
-    int start_index: index to end counting at
-    """
-
-    count = -1
-    line_iter = iter(range(start_index+1))
-    for i in line_iter:
-        if lines[i] == "\n" or lines[i] == "\r":
-            count = count + 1
-            if lines[i:i+2] == "\r\n":
-                next(line_iter,None)
-    return count
 
+class LineIndex(object):
+    """
+    Index of the offsets where the lines of a text start. It is built
+    once per file so that turning an offset into a line number is a
+    binary search instead of a scan from the beginning of the text.
+    `\r\n`, `\r` and `\n` are all counted as a single line break
+    """
 
+    LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+    def __init__(self, text):
+        self.starts = array("l", [0])
+        self.starts.extend(match.end() for match in self.LINE_BREAK.finditer(text))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lineno(self, offset):
+        """
+        Gets the line number (starting at 1) an offset falls in
+        Parameters
+        ----------
+        int offset: Index in the text
+        """
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset):
+        """
+        Gets the (line, column) pair of an offset. Line starts at 1
+        and column at 0, same as the tokenize module
+        Parameters
+        ----------
+        int offset: Index in the text
+        """
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1]
+
+    def offset(self, line, column=0):
+        """
+        Gets the offset of a (line, column) pair
+        Parameters
+        ----------
+        int line: Line number, starting at 1
+        int column: Column in the line
+        """
+        return self.starts[line - 1] + column
@@ -0,0 +1,391 @@
+"""
+Discovery of the files to document. In a git checkout the files are
+listed from the index, so that ignored files are never offered.
+Otherwise the project is walked with `os.scandir`. The `include` and
+`exclude` globs of the configuration are compiled once, excluded
+directories are pruned before being entered and paths are yielded as
+they are found.
+"""
+import os
+import re
+import subprocess
+from stat import S_ISLNK
+from .exceptions import GitUnavailable
+
+SNIFF_SIZE = 1024  # Bytes read to tell a binary file from a text file
+# Extensions of source files, taken for text without opening them
+TEXT_EXTENSIONS = frozenset(
+    "c cc cpp cs go h hpp java js jsx kt lua php py pyi rb rs scala sh swift ts tsx".split()
+)
+CHUNK_SIZE = 65536  # Bytes read at once from git
+
+
+def translate(pattern):
+    """
+    Translates a glob into a regular expression. `*` and `?` stay within
+    a path segment, `**` spans any number of segments
+    Parameters
+    ----------
+    str pattern: Glob i.e node_modules, docs/*.py or src/**/test_*.py
+    """
+    result = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            result.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            result.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                group = pattern[index + 1:end]
+                if group.startswith("!"):
+                    group = "^" + group[1:]
+                result.append("[{}]".format(group.replace("\\", "\\\\")))
+                index = end
+        else:
+            result.append(re.escape(char))
+        index += 1
+    return "".join(result)
+
+
+class GlobMatcher(object):
+    """
+    All the globs of a list compiled into two patterns. Globs without a
+    slash match the name of a file or directory at any depth, the others
+    match the path relative to the root of the project
+    """
+
+    def __init__(self, patterns=()):
+        names = []
+        paths = []
+        for pattern in patterns or ():
+            pattern = pattern.strip().replace(os.sep, "/").rstrip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                paths.append(translate(pattern.lstrip("/")))
+            else:
+                names.append(translate(pattern))
+        self.names = self._compile(names)
+        self.paths = self._compile(paths)
+
+    def _compile(self, patterns):
+        if not patterns:
+            return None
+        return re.compile("(?:{})\\Z".format("|".join(patterns)), flags=re.DOTALL)
+
+    def __bool__(self):
+        return self.names is not None or self.paths is not None
+
+    __nonzero__ = __bool__
+
+    def match(self, relpath, name=None):
+        """
+        Checks a path against the globs
+        Parameters
+        ----------
+        str relpath: Path relative to the root, with forward slashes
+        str name: Name of the file or directory, taken from relpath if not given
+        """
+        if name is None:
+            name = relpath.rsplit("/", 1)[-1]
+        if self.names is not None and self.names.match(name):
+            return True
+        return self.paths is not None and self.paths.match(relpath) is not None
+
+
+def is_binary(path):
+    """
+    Tells if a file is binary, the same way git does, by looking for
+    a null byte at its beginning
+    Parameters
+    ----------
+    str path: path of the file
+    """
+    try:
+        with open(path, "rb") as stream:
+            return b"\0" in stream.read(SNIFF_SIZE)
+    except (IOError, OSError):
+        return True
+
+
+def identity(path, stat):
+    """
+    Identifies a file or directory whatever the symbolic links it was
+    reached through, by its device and inode, or by its real path where
+    inodes are not available
+    Parameters
+    ----------
+    str path: path of the file or directory
+    os.stat_result stat: Status of the file, following symbolic links
+    """
+    if stat.st_ino:
+        return stat.st_dev, stat.st_ino
+    return os.path.realpath(path)
+
+
+def git_ls_files(root, options, pathspecs=()):
+    """
+    Yields the paths listed by `git ls-files`, relative to the root, as
+    git writes them. Raises GitUnavailable when the root is not in a
+    git checkout or git cannot be run
+    Parameters
+    ----------
+    str root: Directory to list the files of
+    list options: Options of git ls-files i.e --cached
+    list pathspecs: Pathspecs the files have to match i.e *.py
+    """
+    command = ["git", "ls-files", "-z"] + list(options) + ["--"] + list(pathspecs)
+    try:
+        process = subprocess.Popen(
+            command, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except OSError as e:
+        raise GitUnavailable("Could not run git: {}".format(e))
+    previous = None
+    rest = b""
+    try:
+        for chunk in iter(lambda: process.stdout.read1(CHUNK_SIZE), b""):
+            paths = (rest + chunk).split(b"\0")
+            rest = paths.pop()
+            for path in paths:
+                # Unmerged files are listed once per stage
+                if path != previous:
+                    previous = path
+                    yield os.fsdecode(path)
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        returncode = process.wait()
+    if returncode != 0:
+        raise GitUnavailable("{} is not in a git checkout".format(root))
+
+
+class FileWalker(object):
+    """
+    Finds the files to document under a root. Hidden entries are
+    skipped. Symbolic links to targets under the root are skipped, as
+    the targets are walked under their own paths, and a file or
+    directory reached twice is only visited once
+    """
+
+    def __init__(
+        self, root, extensions=None, max_size=None, discovery="walk", submodules=False
+    ):
+        self.root = root
+        self.real_root = os.path.realpath(root)
+        self.extensions = set(extensions or ())
+        self.max_size = max_size
+        self.discovery = discovery
+        self.submodules = submodules
+        self.include = GlobMatcher()
+        self.exclude = GlobMatcher()
+
+    def relpath(self, path):
+        """
+        Path relative to the root, with forward slashes
+        Parameters
+        ----------
+        str path: path of a file or directory
+        """
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def contains(self, path):
+        """
+        Tells if a real path is under the root
+        Parameters
+        ----------
+        str path: Absolute path without symbolic links
+        """
+        return path == self.real_root or path.startswith(self.real_root + os.sep)
+
+    def _wanted(self, relpath, name):
+        """
+        Checks the name and globs of a file, without touching the disk
+        Parameters
+        ----------
+        str relpath: Path relative to the root
+        str name: Name of the file
+        """
+        if self.extensions and os.path.splitext(name)[1][1:] not in self.extensions:
+            return False
+        if self.include and not self.include.match(relpath, name):
+            return False
+        return not self.exclude.match(relpath, name)
+
+    def _readable(self, path, size):
+        """
+        Checks that a file is neither oversized nor binary. Source files
+        are not opened, so that discovery only reads directories
+        Parameters
+        ----------
+        str path: path of the file
+        int size: Size of the file in bytes
+        """
+        if self.max_size and size > self.max_size:
+            return False
+        if os.path.splitext(path)[1][1:].lower() in TEXT_EXTENSIONS:
+            return True
+        return not is_binary(path)
+
+    def _listed(self, relpath):
+        """
+        Checks a path found without walking, i.e given or listed by
+        git, against the hidden entries and the globs of its directories
+        Parameters
+        ----------
+        str relpath: Path relative to the root
+        """
+        parts = relpath.split("/")
+        if any(part.startswith(".") and part != ".." for part in parts):
+            return False
+        for index in range(1, len(parts)):
+            if self.exclude.match("/".join(parts[:index]), parts[index - 1]):
+                return False
+        return self._wanted(relpath, parts[-1])
+
+    def matches(self, path):
+        """
+        Checks the path of a file against the hidden entries, extensions
+        and globs, without touching the disk, i.e for file events
+        Parameters
+        ----------
+        str path: path of the file
+        """
+        return self._listed(self.relpath(path))
+
+    def accepts(self, path):
+        """
+        Checks a single file against the whole walker, for files that
+        are given instead of walked
+        Parameters
+        ----------
+        str path: path of the file
+        """
+        if not self.matches(path):
+            return False
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        return self._readable(path, size)
+
+    def filter(self, paths):
+        """
+        Yields the given files accepted by the walker, once each
+        Parameters
+        ----------
+        list paths: Pre-given files
+        """
+        seen = set()
+        for path in paths:
+            real = os.path.realpath(path)
+            if real in seen:
+                continue
+            seen.add(real)
+            if self.accepts(path):
+                yield path
+
+    def files(self):
+        """
+        Yields the files to document. In a git checkout they are listed
+        from the index, along with the untracked files that are not
+        ignored. Outside of one, or without git, the root is walked
+        """
+        if self.discovery == "git":
+            listed = False
+            try:
+                for path in self.git_files():
+                    listed = True
+                    yield path
+                return
+            except GitUnavailable:
+                if listed:
+                    return
+        for path in self.walk():
+            yield path
+
+    def git_files(self):
+        """
+        Yields the files of the git checkout holding the root that
+        match the extensions, the globs, and the size and binary checks
+        """
+        seen = set()
+        pathspecs = ["*.{}".format(extension) for extension in sorted(self.extensions)]
+        commands = [["--cached", "--others", "--exclude-standard"]]
+        if self.submodules:
+            commands = [["--cached", "--recurse-submodules"], ["--others", "--exclude-standard"]]
+        for options in commands:
+            for relpath in git_ls_files(self.root, options, pathspecs):
+                if not self._listed(relpath):
+                    continue
+                path = os.path.join(self.root, relpath)
+                try:
+                    stat = os.lstat(path)
+                    if S_ISLNK(stat.st_mode):
+                        if self.contains(os.path.realpath(path)):
+                            # The target is listed under its own path
+                            continue
+                        stat = os.stat(path)
+                except OSError:
+                    # Deleted from the working tree
+                    continue
+                key = identity(path, stat)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self._readable(path, stat.st_size):
+                    yield path
+
+    def walk(self):
+        """
+        Yields the files to document, depth first. The files of a
+        directory come before its subdirectories, as with os.walk
+        """
+        seen = set([identity(self.root, os.stat(self.root))])
+        stack = [(self.root, "")]
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                relpath = prefix + entry.name
+                try:
+                    if entry.is_symlink() and self.contains(os.path.realpath(entry.path)):
+                        # The target is walked under its own path
+                        continue
+                    is_dir = entry.is_dir()
+                    if is_dir and self.exclude.match(relpath, entry.name):
+                        continue
+                    if not is_dir and not self._wanted(relpath, entry.name):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                key = identity(entry.path, stat)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if is_dir:
+                    subdirectories.append((entry.path, relpath + "/"))
+                elif self._readable(entry.path, stat.st_size):
+                    yield entry.path
+            stack.extend(reversed(subdirectories))
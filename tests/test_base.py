@@ -0,0 +1,28 @@
+from dyc.base import SourceFile
+
+
+class TestSourceFile:
+    def test_splices_insertions_in_one_write(self, tmpdir):
+        """Insertions refer to the original offsets whatever their order"""
+        path = tmpdir.join('example.py')
+        path.write('a\nb\nc\n')
+        source = SourceFile(str(path))
+        source.insert(4, 'C\n')
+        source.insert(0, 'top\n')
+        source.insert(2, 'B\n')
+        assert source.write() == True
+        assert path.read() == 'top\na\nB\nb\nC\nc\n'
+
+    def test_same_offset_keeps_queue_order(self, tmpdir):
+        path = tmpdir.join('example.py')
+        path.write('x')
+        source = SourceFile(str(path))
+        source.insert(0, '1')
+        source.insert(0, '2')
+        assert source.render() == '12x'
+
+    def test_no_write_without_changes(self, tmpdir):
+        path = tmpdir.join('example.py')
+        path.write('x')
+        source = SourceFile(str(path))
+        assert source.write() == False
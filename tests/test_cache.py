@@ -0,0 +1,56 @@
+import os
+from dyc.cache import ConfigCache, ScanCache
+
+
+FINDINGS = [{'path': 'x', 'line': 1, 'column': 1, 'kind': 'top', 'name': 'x'}]
+
+
+class TestScanCache:
+    def cache(self, tmpdir, config=None):
+        return ScanCache(str(tmpdir.join('.dyc-cache')), config or {'formats': []})
+
+    def put(self, tmpdir, text='def a():\n    pass\n'):
+        path = tmpdir.join('example.py')
+        path.write(text)
+        os.utime(str(path), (0, 0))  # Old enough to be trusted on mtime
+        cache = self.cache(tmpdir)
+        cache.put(str(path), text, FINDINGS)
+        cache.save()
+        return str(path)
+
+    def test_unchanged_file_is_a_hit(self, tmpdir):
+        path = self.put(tmpdir)
+        assert self.cache(tmpdir).get(path) == [dict(FINDINGS[0], path=path)]
+
+    def test_touched_file_is_compared_by_content(self, tmpdir):
+        path = self.put(tmpdir)
+        os.utime(path, (10, 10))
+        assert self.cache(tmpdir).get(path) is not None
+        tmpdir.join('example.py').write('def b():\n    pass\n')
+        os.utime(path, (20, 20))
+        assert self.cache(tmpdir).get(path) is None
+
+    def test_config_change_drops_the_cache(self, tmpdir):
+        path = self.put(tmpdir)
+        assert self.cache(tmpdir, {'formats': [{'extension': 'py'}]}).get(path) is None
+
+
+class TestConfigCache:
+    def test_merged_config_is_keyed_by_the_files(self, tmpdir):
+        custom = tmpdir.join('dyc.yaml')
+        custom.write('scan_budget: 1\n')
+        directory = str(tmpdir.join('cache'))
+        cache = ConfigCache([str(custom)], directory=directory)
+        assert cache.get() is None
+        cache.put({'plain': {'scan_budget': 1}, 'custom': True})
+        assert ConfigCache([str(custom)], directory=directory).get() == {
+            'plain': {'scan_budget': 1},
+            'custom': True,
+        }
+        custom.write('scan_budget: 2\n')
+        assert ConfigCache([str(custom)], directory=directory).get() is None
+
+    def test_configs_json_would_alter_are_not_stored(self, tmpdir):
+        cache = ConfigCache([], directory=str(tmpdir))
+        cache.put({'plain': {1: 'a'}, 'custom': True})
+        assert cache.get() is None
@@ -0,0 +1,23 @@
+import pytest
+from dyc.configs import Config
+from dyc.configs.spec import compile_formats
+
+
+class TestFormatSpec:
+    def test_compiled_once_per_extension(self):
+        formats = compile_formats(Config.default.get('formats'))
+        spec = formats['py']
+        assert spec.get('extension') == 'py'
+        assert spec.method.pattern.search('def hello(name):\n')
+        assert spec.method.argument_format['title'] == 'Parameters\n----------\n'
+        assert spec.method.format['break_after_open'] == ''
+        assert spec.cls.format['indent_content'] == '    '
+
+    def test_read_only(self):
+        spec = compile_formats(Config.default.get('formats'))['py']
+        with pytest.raises(AttributeError):
+            spec.method.pattern = None
+        with pytest.raises(TypeError):
+            spec.method['ignore'] = []
+        with pytest.raises(TypeError):
+            spec.method.format['indent'] = ''
@@ -0,0 +1,152 @@
+import copy
+import json
+import threading
+import subprocess
+from click.testing import CliRunner
+from dyc.diff import Diff, DiffParser
+from dyc.dyc import main
+from dyc.configs import Config
+
+
+DIFF = '''diff --git a/a.py b/a.py
+index 1111111..2222222 100644
+--- a/a.py
++++ b/a.py
+@@ -3 +3 @@ def a():
+-    return 1
++    return 2
+@@ -10,0 +11,2 @@ def b():
++def c():
++    pass
+@@ -20,2 +22,0 @@
+-x = 1
+-y = 2
+diff --git a/lock.txt b/lock.txt
+--- a/lock.txt
++++ b/lock.txt
+@@ -1 +1,2 @@
+-a
++++ b/sneaky.py
++b
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+--- a/gone.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+diff --git a/new.py b/new.py
+new file mode 100644
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,2 @@
++def d():
++    pass'''
+
+
+class TestDiffParser:
+    def test_split_in_one_pass(self):
+        records = [
+            (path, sorted(additions.lines))
+            for path, additions in DiffParser()._split(iter(DIFF.split('\n')))
+        ]
+        assert records == [('a.py', [3, 11, 12]), ('lock.txt', [1, 2]), ('new.py', [1, 2])]
+
+    def test_split_skips_rejected_files(self):
+        records = DiffParser()._split(
+            DIFF.split('\n'), accept=lambda path: path.endswith('.py') and path != 'a.py'
+        )
+        assert [path for path, _ in records] == ['new.py']
+
+    def test_quoted_names(self):
+        lines = [
+            'diff --git "a/caf\\303\\251.py" "b/caf\\303\\251.py"',
+            '+++ "b/caf\\303\\251.py"',
+            '@@ -1,0 +2 @@',
+            'diff --git "a/q\\"t.py" "b/q\\"t.py"',
+            '+++ "b/q\\"t.py"',
+            '@@ -1,0 +2 @@',
+        ]
+        records = DiffParser()._split(lines)
+        assert [path for path, _ in records] == ['caf\u00e9.py', 'q"t.py']
+
+    def test_names_with_spaces(self):
+        lines = ['diff --git a/sp ace.py b/sp ace.py', '+++ b/sp ace.py\t', '@@ -1,0 +2 @@']
+        records = DiffParser()._split(lines)
+        assert [path for path, _ in records] == ['sp ace.py']
+
+
+class TestDiffBase:
+    def git(self, tmpdir, *args):
+        subprocess.check_call(('git',) + args, cwd=str(tmpdir))
+
+    def repository(self, tmpdir, monkeypatch, files):
+        """Commits the files in a new repository, the working directory"""
+        self.git(tmpdir, 'init', '-q')
+        self.git(tmpdir, 'config', 'user.email', 'dyc@example.com')
+        self.git(tmpdir, 'config', 'user.name', 'dyc')
+        for name, text in files.items():
+            tmpdir.join(name).write(text)
+        self.git(tmpdir, 'add', '.')
+        self.git(tmpdir, 'commit', '-qm', 'base')
+        monkeypatch.chdir(tmpdir)
+
+    def test_branch_changes_since_merge_base(self, tmpdir, monkeypatch):
+        self.repository(tmpdir, monkeypatch, {'a.py': 'a = 1\n'})
+        self.git(tmpdir, 'branch', 'base')
+        tmpdir.join('a.py').write('a = 1\nb = 2\n')
+        self.git(tmpdir, 'commit', '-qam', 'branch')
+        tmpdir.join('a.py').write('a = 1\nb = 2\nc = 3\n')
+        config = copy.deepcopy(Config.default)
+        assert sorted(Diff(config).uncommitted['a.py']['additions'].lines) == [3]
+        changes = Diff(config, base='base').uncommitted
+        assert sorted(changes['a.py']['additions'].lines) == [2, 3]
+
+    def test_check_base_prints_only_the_report(self, tmpdir, monkeypatch):
+        self.repository(tmpdir, monkeypatch, {'a.py': 'a = 1\n', 'notes.txt': 'a\n'})
+        self.git(tmpdir, 'branch', 'base')
+        tmpdir.join('a.py').write('def b(x):\n    return x\n', mode='a')
+        tmpdir.join('notes.txt').write('b\n', mode='a')
+        result = CliRunner(mix_stderr=False).invoke(main, ['check', '--base', 'base'])
+        assert result.exit_code == 1
+        assert json.loads(result.stdout)['summary']['method'] == 1
+        assert 'notes.txt is not a candidate' in result.stderr
+
+    def test_only_given_files_are_diffed(self, tmpdir, monkeypatch):
+        files = {'a.py': 'a = 1\n', 'b.py': 'b = 1\n', 'c.txt': 'c\n'}
+        self.repository(tmpdir, monkeypatch, files)
+        for name in files:
+            tmpdir.join(name).write('x\n', mode='a')
+        config = copy.deepcopy(Config.default)
+        assert list(Diff(config, paths=['b.py', 'c.txt']).uncommitted) == ['b.py']
+        assert Diff(config, paths=['c.txt']).uncommitted == {}
+
+    def test_staged_files_are_listed_again_when_the_index_changes(self, tmpdir, monkeypatch):
+        self.repository(tmpdir, monkeypatch, {'a.py': 'a = 1\n', 'b.py': 'b = 1\n'})
+        tmpdir.join('a.py').write('x\n', mode='a')
+        tmpdir.join('b.py').write('x\n', mode='a')
+        diff = Diff(copy.deepcopy(Config.default))
+        diff.select(['a.py'])
+        assert list(diff.uncommitted) == ['a.py']
+        staged = diff.staged
+        diff.select(['b.py'])
+        assert diff.uncommitted['b.py']['staged'] == False
+        assert diff.staged is staged
+        self.git(tmpdir, 'add', 'b.py')
+        assert diff.uncommitted['b.py']['staged'] == True
+        assert diff.uncommitted['b.py']['unstaged'] == False
+
+    def test_warnings_of_git_never_block_the_diff(self, tmpdir, monkeypatch):
+        # Every file gets a warning of about 300 bytes, over 64 KiB in all
+        names = ['{}_{}.py'.format('x' * 200, index) for index in range(300)]
+        self.repository(tmpdir, monkeypatch, dict((name, 'a = 1\n') for name in names))
+        self.git(tmpdir, 'config', 'core.autocrlf', 'true')
+        for name in names:
+            tmpdir.join(name).write('b = 1\n', mode='a')
+        changes = {}
+        diff = Diff(copy.deepcopy(Config.default))
+        thread = threading.Thread(target=lambda: changes.update(diff.uncommitted))
+        thread.daemon = True
+        thread.start()
+        thread.join(60)
+        assert not thread.is_alive()
+        assert len(changes) == len(names)
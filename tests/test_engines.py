@@ -0,0 +1,131 @@
+import pytest
+from dyc.base import SourceFile
+from dyc.configs import Config
+from dyc.configs.spec import compile_formats
+from dyc.engines.PythonEngine import PythonEngine
+from dyc.engines.RegexEngine import RegexEngine
+from dyc.exceptions import ScanTimeout
+
+SPEC = compile_formats(Config.default.get('formats'))['py']
+
+SOURCE = '''"""
+Module docstring
+"""
+TEXT = "def not_a_method(a):"
+# class NotAClass:
+
+
+class Documented(object):
+    """Already documented"""
+
+    def method(self, name, *args, key=None, **kwargs):
+        return name
+
+    def one_line(self): return 1
+
+
+async def run(a: dict = {"x": 1}, b=(1, 2)) -> None:
+    # comment before the body
+    pass
+'''
+
+
+def scan(tmpdir, text):
+    path = tmpdir.join('example.py')
+    path.write(text)
+    return PythonEngine(SourceFile(str(path)))
+
+
+class TestPythonEngine:
+    def test_top(self, tmpdir):
+        assert scan(tmpdir, SOURCE).top({}) == True
+        assert scan(tmpdir, '# comment\nx = 1\n').top({}) == False
+
+    def test_ignores_strings_and_comments(self, tmpdir):
+        engine = scan(tmpdir, SOURCE)
+        names = [c.name for c in engine.candidates]
+        assert names == ['Documented', 'method', 'run']
+
+    def test_documented(self, tmpdir):
+        engine = scan(tmpdir, SOURCE)
+        assert [c.documented for c in engine.candidates] == [True, False, False]
+
+    def test_docstring_forms(self, tmpdir):
+        text = (
+            'def a():\n'
+            '    """doc"""  # note\n'
+            'def b():\n'
+            '    "one " "two"\n'
+            'def c():\n'
+            '    ("one "\n'
+            '     "two")\n'
+            'def d():\n'
+            '    "doc".strip()\n'
+        )
+        engine = scan(tmpdir, text)
+        assert [c.documented for c in engine.candidates] == [True, True, True, False]
+        assert scan(tmpdir, '"""doc"""  # note\nx = 1\n').top({}) == True
+
+    def test_arguments_and_indent(self, tmpdir):
+        engine = scan(tmpdir, SOURCE)
+        method, run = engine.methods({'within_scope': True})
+        assert method.arguments == ['self', 'name', 'args', 'key', 'kwargs']
+        assert method.indent == '        '
+        assert run.arguments == ['a', 'b']
+        assert run.indent == '    '
+
+    def test_multiline_arguments(self, tmpdir):
+        text = (
+            'def f(\n'
+            '    alpha,\n'
+            '    beta=1,\n'
+            '    *args,\n'
+            '    # c\n'
+            '    gamma,\n'
+            '):\n'
+            '    pass\n'
+        )
+        method, = scan(tmpdir, text).methods({'within_scope': True})
+        assert method.arguments == ['alpha', 'beta', 'args', 'gamma']
+
+    def test_offsets(self, tmpdir):
+        engine = scan(tmpdir, SOURCE)
+        run = engine.methods({'within_scope': True})[-1]
+        assert SOURCE[run.start:run.end] == (
+            'def run(a: dict = {"x": 1}, b=(1, 2)) -> None:'
+        )
+
+
+class TestRegexEngine:
+    def scan(self, tmpdir, text, budget=None):
+        path = tmpdir.join('example.py')
+        path.write(text)
+        return RegexEngine(SourceFile(str(path), budget=budget))
+
+    def test_bounded_methods(self, tmpdir):
+        """Commented or unfinished declarations never reach the next method"""
+        text = (
+            '# def commented(a):\n'
+            'def unfinished\n'
+            '\n'
+            'def nested(a=(1, 2), b=f(x)):\n'
+            '    """documented"""\n'
+            'async def run(a):\n'
+            '    pass\n'
+        )
+        methods = self.scan(tmpdir, text).methods(SPEC.method)
+        assert [m.name for m in methods] == ['nested', 'run']
+        assert methods[0].arguments == ['a=(1', ' 2)', ' b=f(x)']
+        assert [m.documented for m in methods] == [True, False]
+
+    def test_classes(self, tmpdir):
+        text = 'class A(Base, metaclass=M):\n    pass\nclass B:\n    """doc"""\n'
+        classes = self.scan(tmpdir, text).classes(SPEC.cls)
+        assert [(c.name, c.documented) for c in classes] == [('A', False), ('B', True)]
+        assert text[classes[0].start:classes[0].end] == 'class A(Base, metaclass=M):'
+
+    def test_scan_budget(self, tmpdir):
+        engine = self.scan(tmpdir, 'def a(b):\n    pass\n', budget=1)
+        engine.deadline = 0
+        with pytest.raises(ScanTimeout):
+            engine.methods(SPEC.method)
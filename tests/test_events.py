@@ -0,0 +1,148 @@
+import time
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirModifiedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+from watchdog.observers import Observer
+from dyc.events import WatchEvent, WatchQueue, watched_directories
+from dyc.walker import FileWalker, GlobMatcher
+
+
+class TestWatchQueue:
+    def test_events_are_coalesced_per_path(self, tmpdir, monkeypatch):
+        monkeypatch.chdir(tmpdir)
+        tmpdir.join('a.py').write('a = 1\n')
+        tmpdir.join('b.py').write('b = 1\n')
+        batches = []
+        queue = WatchQueue(lambda batch, record: batches.append(batch), debounce=0.05)
+        queue.start()
+        for _ in range(5):
+            queue.put('./a.py')
+            queue.put('./b.py')
+        time.sleep(0.3)
+        queue.stop()
+        assert [sorted(batch) for batch in batches] == [['a.py', 'b.py']]
+
+    def test_own_writes_are_ignored(self, tmpdir, monkeypatch):
+        monkeypatch.chdir(tmpdir)
+        tmpdir.join('a.py').write('a = 1\n')
+        batches = []
+
+        def handler(batch, record):
+            batches.append(batch)
+            tmpdir.join('a.py').write('"""doc"""\na = 1\n')
+            record('a.py')
+            queue.put('./a.py')
+
+        queue = WatchQueue(handler, debounce=0.05)
+        queue.start()
+        queue.put('./a.py')
+        time.sleep(0.3)
+        tmpdir.join('a.py').write('a = 2\n')
+        queue.put('./a.py')
+        time.sleep(0.3)
+        queue.stop()
+        assert batches == [['a.py'], ['a.py']]
+
+    def test_saves_during_a_batch_are_handled(self, tmpdir, monkeypatch):
+        monkeypatch.chdir(tmpdir)
+        tmpdir.join('a.py').write('a = 1\n')
+        batches = []
+
+        def handler(batch, record):
+            batches.append(batch)
+            if len(batches) == 1:
+                tmpdir.join('a.py').write('"""doc"""\na = 1\n')
+                record('a.py')
+                # Saved by the user before the batch is over
+                tmpdir.join('a.py').write('"""doc"""\na = 1\nb = 2\n')
+                queue.put('./a.py')
+
+        queue = WatchQueue(handler, debounce=0.05)
+        queue.start()
+        queue.put('./a.py')
+        time.sleep(0.3)
+        queue.stop()
+        assert batches == [['a.py'], ['a.py']]
+
+
+class Recorder:
+    def __init__(self):
+        self.paths = []
+
+    def put(self, path):
+        self.paths.append(path)
+
+
+class FakeObserver:
+    def __init__(self):
+        self.watched = []
+
+    def schedule(self, handler, path, recursive=False):
+        self.watched.append(path)
+        return path
+
+    def unschedule(self, watch):
+        self.watched.remove(watch)
+
+
+class TestWatchEvent:
+    def walker(self, tmpdir):
+        walker = FileWalker(str(tmpdir), extensions=['py'])
+        walker.exclude = GlobMatcher(['node_modules'])
+        return walker
+
+    def test_only_files_that_can_be_documented_are_queued(self, tmpdir):
+        queue = Recorder()
+        handler = WatchEvent(queue, self.walker(tmpdir))
+        for path in (
+            'a.py',
+            'a.py.swp',
+            '.git/index',
+            'web/node_modules/b.py',
+            'web/.cache/c.py',
+        ):
+            handler.dispatch(FileModifiedEvent(str(tmpdir.join(path))))
+        handler.dispatch(DirModifiedEvent(str(tmpdir.join('src'))))
+        handler.dispatch(FileDeletedEvent(str(tmpdir.join('c.py'))))
+        handler.dispatch(FileMovedEvent(str(tmpdir.join('.a.py.tmp')), str(tmpdir.join('b.py'))))
+        assert queue.paths == [str(tmpdir.join('a.py')), str(tmpdir.join('b.py'))]
+
+    def test_hidden_and_excluded_directories_are_not_watched(self, tmpdir):
+        for name in ('src', '.git', 'node_modules'):
+            tmpdir.mkdir(name)
+        tmpdir.join('a.py').write('a = 1\n')
+        assert list(watched_directories(self.walker(tmpdir))) == [str(tmpdir.join('src'))]
+
+    def test_directories_created_at_the_root_are_watched(self, tmpdir):
+        observer = FakeObserver()
+        handler = WatchEvent(Recorder(), self.walker(tmpdir), observer)
+        for name in ('src', '.cache', 'node_modules', 'src/nested'):
+            handler.dispatch(DirCreatedEvent(str(tmpdir.join(name))))
+        assert observer.watched == [str(tmpdir.join('src'))]
+        handler.dispatch(DirDeletedEvent(str(tmpdir.join('src'))))
+        assert observer.watched == []
+
+    def test_files_of_a_new_directory_are_queued(self, tmpdir):
+        queue = Recorder()
+        walker = self.walker(tmpdir)
+        observer = Observer()
+        handler = WatchEvent(queue, walker, observer)
+        observer.schedule(handler, walker.root)
+        observer.start()
+        try:
+            tmpdir.mkdir('src')
+            deadline = time.time() + 5
+            while not handler.directories.watches and time.time() < deadline:
+                time.sleep(0.05)
+            tmpdir.join('src', 'a.py').write('a = 1\n')
+            while not queue.paths and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            observer.stop()
+            observer.join()
+        assert str(tmpdir.join('src', 'a.py')) in queue.paths
@@ -0,0 +1,37 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('git', 'watchdog', 'yaml', 'concurrent.futures', 'dyc.main', 'dyc.diff')
+
+
+def imported(code, cwd):
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=str(cwd),
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert process.returncode == 0, process.stderr
+    return set(
+        line.split('|')[-1].strip()
+        for line in process.stderr.splitlines()
+        if line.startswith('import time:')
+    )
+
+
+class TestImportTime:
+    def test_cli_startup_leaves_heavy_modules_out(self, tmpdir):
+        modules = imported('import dyc.dyc; dyc.dyc.ParsedConfig()', tmpdir)
+        assert 'dyc.dyc' in modules
+        assert [module for module in HEAVY if module in modules] == []
+
+    def test_config_is_loaded_on_first_use_then_cached(self, tmpdir):
+        code = 'import dyc.dyc; dyc.dyc.ParsedConfig().plain'
+        assert 'yaml' in imported(code, tmpdir)
+        assert tmpdir.join('.dyc-cache', 'config.json').exists()
+        assert 'yaml' not in imported(code, tmpdir)
+        tmpdir.join('dyc.yaml').write('scan_budget: 1\n')
+        assert 'yaml' in imported(code, tmpdir)
@@ -0,0 +1,80 @@
+import os
+import copy
+import click
+from dyc.main import DYC
+from dyc.configs import Config
+from dyc.cache import ScanCache
+
+SOURCES = {
+    'a.py': 'def first(a, b):\n    return a\n',
+    'b.py': '"""\nDocumented\n"""\n\n\ndef second():\n    """done"""\n',
+    'c.py': 'class Third(object):\n    def run(self, x):\n        pass\n',
+    # Does not tokenize, so the regex engine scans it, over the budget
+    'd.py': 'def f(a):\n    pass\n' * 2000 + 'x = (\n',
+}
+
+
+class TestDocumentParallel:
+    def run(self, tmpdir, capsys, monkeypatch, jobs, cache=None):
+        monkeypatch.setattr(click, 'confirm', lambda *args, **kwargs: True)
+        monkeypatch.chdir(str(tmpdir))
+        paths = []
+        for name, text in sorted(SOURCES.items()):
+            path = tmpdir.join(name)
+            path.write(text)
+            os.utime(str(path), (0, 0))
+            paths.append(str(path))
+        config = copy.deepcopy(Config.default)
+        config['file_list'] = paths
+        config['scan_budget'] = 0.000001
+        self.config = config
+        if cache is not None:
+            cache = ScanCache(str(tmpdir.join(cache)), config)
+        dyc = DYC(config, placeholders=True, cache=cache)
+        dyc.prepare()
+        dyc.document(jobs=jobs)
+        output = capsys.readouterr().out.replace(str(tmpdir), '')
+        contents = [open(path).read() for path in paths]
+        written = [os.path.basename(p) for p in paths if os.stat(p).st_mtime]
+        skipped = [p.replace(str(tmpdir), '') for p in dyc.skipped]
+        return output, contents, written, skipped
+
+    def test_matches_the_sequential_run(self, tmpdir, capsys, monkeypatch):
+        # Builders print the last three parts of the paths
+        sequential = tmpdir.mkdir('sequential').mkdir('src').mkdir('project')
+        parallel = tmpdir.mkdir('parallel').mkdir('src').mkdir('project')
+        sequential = self.run(sequential, capsys, monkeypatch, 1)
+        parallel = self.run(parallel, capsys, monkeypatch, 2)
+        assert parallel == sequential
+        output, contents, written, skipped = parallel
+        assert written == ['a.py', 'c.py']
+        assert skipped == ['/d.py']
+        assert '<docstring>' in contents[0] and '<docstring>' in contents[2]
+        assert contents[1] == SOURCES['b.py']
+        assert contents[3] == SOURCES['d.py']
+        assert output.index('/a.py') < output.index('/c.py') < output.index('/d.py')
+
+    def test_caches_files_left_as_they_are(self, tmpdir, capsys, monkeypatch):
+        self.run(tmpdir, capsys, monkeypatch, 2, cache='.dyc-cache')
+        cache = ScanCache(str(tmpdir.join('.dyc-cache')), self.config)
+        cached = sorted(os.path.basename(path) for path in cache.entries)
+        assert cached == ['b.py']
+
+
+class TestEngines:
+    def test_regex_engine_renders_like_the_python_engine(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(click, 'confirm', lambda *args, **kwargs: True)
+        text = 'class A(object):\n\n    def run(self, x):\n\n        return x\n'
+        results = []
+        for engine in ('python', 'regex'):
+            path = tmpdir.join('{}.py'.format(engine))
+            path.write(text)
+            config = copy.deepcopy(Config.default)
+            config['formats'][0]['engine'] = engine
+            config['file_list'] = [str(path)]
+            dyc = DYC(config, placeholders=True)
+            dyc.prepare()
+            dyc.document()
+            results.append(path.read())
+        assert results[1] == results[0]
+        assert '\n\n    """' not in results[1]
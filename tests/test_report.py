@@ -0,0 +1,65 @@
+import json
+import copy
+from dyc.main import DYC
+from dyc.configs import Config
+from dyc.report import json_report, sarif_report
+from dyc.utils import HunkIndex
+
+
+EXAMPLE = '''"""
+Top
+"""
+class Documented(object):
+    """
+    Documented
+    """
+    def run(self, a):
+        pass
+
+def helper(x):
+    return x
+'''
+
+
+class TestCheck:
+    def check(self, tmpdir, text=EXAMPLE, additions=None):
+        path = tmpdir.join('example.py')
+        path.write(text)
+        config = copy.deepcopy(Config.default)
+        config['file_list'] = [str(path)]
+        dyc = DYC(config)
+        dyc.prepare()
+        changes = None
+        if additions is not None:
+            changes = {str(path): {'additions': HunkIndex(additions)}}
+        return str(path), dyc.check(changes=changes)
+
+    def test_finds_undocumented_symbols_without_writing(self, tmpdir):
+        path, findings = self.check(tmpdir)
+        assert [(f['kind'], f['name'], f['line'], f['column']) for f in findings] == [
+            ('method', 'run', 8, 5),
+            ('method', 'helper', 11, 1),
+        ]
+        assert open(path).read() == EXAMPLE
+
+    def test_top_is_only_reported_when_the_first_line_was_added(self, tmpdir):
+        text = EXAMPLE.split('"""', 2)[2].lstrip()
+        _, findings = self.check(tmpdir, text, additions=[8, 9])
+        assert [f['kind'] for f in findings] == ['method']
+        _, findings = self.check(tmpdir, text, additions=range(1, 10))
+        assert [f['kind'] for f in findings] == ['top', 'method', 'method']
+
+    def test_reports(self, tmpdir, monkeypatch):
+        monkeypatch.chdir(str(tmpdir))
+        path, findings = self.check(tmpdir)
+        report = json.loads(json_report(findings))
+        assert report['total'] == 2
+        assert [f['path'] for f in report['findings']] == ['example.py'] * 2
+        assert report['summary'] == {'top': 0, 'class': 0, 'method': 2}
+        sarif = json.loads(sarif_report(findings, skipped=[path]))
+        run = sarif['runs'][0]
+        assert sarif['version'] == '2.1.0'
+        assert [r['ruleId'] for r in run['results']] == ['undocumented-method'] * 2
+        region = run['results'][1]['locations'][0]['physicalLocation']['region']
+        assert region == {'startLine': 11, 'startColumn': 1}
+        assert len(run['invocations'][0]['toolExecutionNotifications']) == 1
@@ -0,0 +1,67 @@
+import copy
+import json
+import threading
+from types import SimpleNamespace
+from dyc.client import request
+from dyc.configs import Config
+from dyc.configs.spec import compile_formats
+from dyc.main import check_report
+from dyc.server import DYCServer, METHOD_NOT_FOUND
+from dyc.exceptions import ServerError
+from dyc.walker import FileWalker
+
+
+class TestServer:
+    def serve(self, tmpdir, monkeypatch):
+        monkeypatch.chdir(tmpdir)
+        tmpdir.join('a.py').write('def a(x):\n    return x\n')
+        plain = copy.deepcopy(Config.default)
+        plain['discovery'] = 'walk'
+        config = SimpleNamespace(plain=plain, formats=compile_formats(plain['formats']))
+        server = DYCServer(config, path='dyc.sock')
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        return config, server, thread
+
+    def test_check_is_answered_over_the_socket(self, tmpdir, monkeypatch):
+        config, server, thread = self.serve(tmpdir, monkeypatch)
+        try:
+            result = request('check', {'files': ['a.py']}, path='dyc.sock')
+            assert result['failed'] == True
+            assert json.loads(result['report'])['total'] == 2
+            assert (result['report'], True) == check_report(config, files=['a.py'])
+            try:
+                request('nope', path='dyc.sock')
+                assert False
+            except ServerError as e:
+                assert e.code == METHOD_NOT_FOUND
+        finally:
+            request('stop', path='dyc.sock')
+            thread.join()
+            server.server_close()
+        assert not tmpdir.join('dyc.sock').exists()
+        assert request('ping', path='dyc.sock') is None
+
+    def test_project_files_are_kept_until_a_directory_changes(self, tmpdir, monkeypatch):
+        listings = []
+        files = FileWalker.files
+
+        def count(walker):
+            listings.append(walker.root)
+            for path in files(walker):
+                yield path
+
+        monkeypatch.setattr(FileWalker, 'files', count)
+        config, server, thread = self.serve(tmpdir, monkeypatch)
+        tmpdir.mkdir('.dyc-cache')  # Made by the first run otherwise
+        try:
+            assert json.loads(request('check', path='dyc.sock')['report'])['total'] == 2
+            assert json.loads(request('check', path='dyc.sock')['report'])['total'] == 2
+            assert len(listings) == 1
+            tmpdir.join('b.py').write('def b(x):\n    return x\n')
+            assert json.loads(request('check', path='dyc.sock')['report'])['total'] == 4
+            assert len(listings) == 2
+        finally:
+            request('stop', path='dyc.sock')
+            thread.join()
+            server.server_close()
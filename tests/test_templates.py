@@ -0,0 +1,32 @@
+from dyc.utils import BlankFormatter
+from dyc.templates import METHOD_LAYOUT, DocstringPlan, Template
+
+
+class TestTemplate:
+    def test_renders_as_blank_formatter(self):
+        values = dict(doc_open='"""', method_docstring='doc', empty_line='\n', doc_close=None)
+        expected = BlankFormatter().format(METHOD_LAYOUT, **values)
+        assert Template(METHOD_LAYOUT).render(values) == expected
+
+    def test_bind_keeps_the_given_fields(self):
+        template = Template('{open}{doc}{close}!').bind(dict(open='<', close='>'), keep=('doc',))
+        assert template.render(dict(doc='x', open='ignored')) == '<x>!'
+        assert [field for _, field, _, _ in template.parts] == ['doc', None]
+
+
+class TestDocstringPlan:
+    def test_shapes_are_rendered_once(self):
+        plan = DocstringPlan('[{doc}]', {}, ('doc',))
+        calls = []
+
+        def build(doc):
+            def render():
+                calls.append(doc)
+                return plan.layout.render(dict(doc=doc))
+
+            return render
+
+        results = plan.render_many([(('a',), build('a')), (('b',), build('b')), (('a',), build('a'))])
+        assert results == ['[a]', '[b]', '[a]']
+        assert plan.render(('b',), build('b')) == '[b]'
+        assert calls == ['a', 'b']
@@ -5,6 +5,9 @@ from dyc.utils import (
     get_indent_backward,
     get_extension,
     is_comment,
+    LineIndex,
+    HunkIndex,
+    parse_hunk_header,
 )
 
 
@@ -24,6 +27,13 @@ class TestGetLeadingWhitespace:
         got = get_leading_whitespace(text)
         assert expected == got
 
+    def test_offsets(self):
+        """Test whitespace of a match within a text, without slicing it"""
+        text = 'class A:\n    def b(self):\n  \n'
+        assert get_leading_whitespace(text, 9) == '    '
+        assert get_leading_whitespace(text, 9, 11) == '  '
+        assert get_leading_whitespace(text, 0) == ''
+
 
 class TestReadYaml:
     def test_should_return_none_if_not_found(self):
@@ -38,7 +48,8 @@ class TestGetIndentForward:
         lines = []
         lines.append( '\n')
         lines.append('This is a Test')
-        assert get_indent_forward(lines, 0) == '\n'
+        assert get_indent_forward(lines, 0) == ''
+        assert get_indent_forward(':\n\n    pass', 2) == '    '
 
 class TestGetIndentBackward:
     def test_backward(self):
@@ -79,6 +90,73 @@ class TestIsComment:
         text = '# Hello World'
         assert is_comment(text, ['//']) == False
 
+class TestLineIndex:
+    def test_lineno(self):
+        """Offsets map to 1-based line numbers"""
+        index = LineIndex('def a():\n    pass\n\ndef b():\n')
+        assert index.lineno(0) == 1
+        assert index.lineno(8) == 1
+        assert index.lineno(9) == 2
+        assert index.lineno(18) == 3
+        assert index.lineno(19) == 4
+
+    def test_crlf_is_one_break(self):
+        """A \\r\\n pair only counts as a single line break"""
+        index = LineIndex('a\r\nb\rc\nd')
+        assert len(index) == 4
+        assert index.lineno(2) == 1
+        assert index.position(3) == (2, 0)
+        assert index.position(7) == (4, 0)
+
+    def test_offset(self):
+        index = LineIndex('ab\ncd\n')
+        assert index.offset(2, 1) == 4
+        assert index.position(index.offset(2, 1)) == (2, 1)
+
+
+class TestHunkIndex:
+    def test_parse_hunk_header(self):
+        assert parse_hunk_header('@@ -10,2 +11,3 @@ def a():') == (10, 2, 11, 3)
+        assert parse_hunk_header('@@ -3 +3 @@') == (3, 1, 3, 1)
+        assert parse_hunk_header('@@ -5,2 +4,0 @@') == (5, 2, 4, 0)
+        assert parse_hunk_header('+@@ -1 +1 @@') == None
+
+    def test_membership(self):
+        """Only the exact added lines are part of the index"""
+        index = HunkIndex([3, 4, 5, 9])
+        assert 4 in index
+        assert 6 not in index
+        assert len(index) == 4
+
+    def test_overlaps(self):
+        """A span overlaps when any of its lines was added"""
+        index = HunkIndex([3, 4, 5, 9])
+        assert index.overlaps(1, 3) == True
+        assert index.overlaps(5, 8) == True
+        assert index.overlaps(6, 8) == False
+        assert index.overlaps(9, 9) == True
+        assert index.overlaps(10, 20) == False
+        assert HunkIndex().overlaps(1, 2) == False
+
+    def test_far_lines_stay_compact(self):
+        """An index holds runs, not one entry per line number"""
+        index = HunkIndex()
+        index.add(3000000, 2)
+        assert index.overlaps(2999990, 3000000) == True
+        assert index.overlaps(1, 2999999) == False
+        assert len(index.starts) == 1
+
+    def test_runs(self):
+        index = HunkIndex()
+        index.add(3, 2)
+        index.add(5)
+        index.add(9, 0)
+        assert list(index.starts) == [3]
+        assert list(index.ends) == [5]
+        assert index.overlaps(5, 100) == True
+        assert 6 not in index
+
+
 class UtilsTest():
     def __init__(self, whitespace, read_yaml, extension, comment,
                  indent_forward, indent_backward):
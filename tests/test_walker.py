@@ -0,0 +1,76 @@
+import os
+import subprocess
+from dyc.walker import FileWalker, GlobMatcher
+
+
+class TestGlobMatcher:
+    def test_names_match_at_any_depth(self):
+        matcher = GlobMatcher(['node_modules', '*.egg-info'])
+        assert matcher.match('node_modules') == True
+        assert matcher.match('web/node_modules') == True
+        assert matcher.match('dyc.egg-info') == True
+        assert matcher.match('src/node_modules.py') == False
+
+    def test_paths_match_from_the_root(self):
+        matcher = GlobMatcher(['docs/*.py', 'src/**/test_*.py'])
+        assert matcher.match('docs/conf.py') == True
+        assert matcher.match('docs/api/conf.py') == False
+        assert matcher.match('src/test_a.py') == True
+        assert matcher.match('src/a/b/test_a.py') == True
+        assert matcher.match('lib/src/test_a.py') == False
+
+    def test_empty(self):
+        assert bool(GlobMatcher([])) == False
+
+
+class TestFileWalker:
+    def tree(self, tmpdir):
+        tmpdir.join('src', 'pkg', 'a.py').write('a = 1\n', ensure=True)
+        tmpdir.join('node_modules', 'b.py').write('b = 1\n', ensure=True)
+        tmpdir.join('.hidden', 'c.py').write('c = 1\n', ensure=True)
+        tmpdir.join('src', 'notes.txt').write('notes\n')
+        tmpdir.join('src', 'blob.tpl').write_binary(b'a\0b')
+        tmpdir.join('src', 'big.py').write('#' * 100)
+        os.symlink(str(tmpdir.join('src', 'pkg')), str(tmpdir.join('linked')))
+        walker = FileWalker(str(tmpdir), extensions=['py', 'tpl'], max_size=50)
+        walker.exclude = GlobMatcher(['node_modules'])
+        return walker
+
+    def test_walk_prunes_and_filters(self, tmpdir):
+        walker = self.tree(tmpdir)
+        assert list(walker.walk()) == [str(tmpdir.join('src', 'pkg', 'a.py'))]
+
+    def test_walk_is_lazy(self, tmpdir):
+        walker = self.tree(tmpdir)
+        assert next(walker.walk()) == str(tmpdir.join('src', 'pkg', 'a.py'))
+
+    def test_filter_given_files(self, tmpdir):
+        walker = self.tree(tmpdir)
+        given = [
+            str(tmpdir.join('src', 'pkg', 'a.py')),
+            str(tmpdir.join('linked', 'a.py')),
+            str(tmpdir.join('node_modules', 'b.py')),
+            str(tmpdir.join('src', 'blob.tpl')),
+        ]
+        assert list(walker.filter(given)) == given[:1]
+
+    def test_source_files_are_not_opened(self, tmpdir, monkeypatch):
+        walker = self.tree(tmpdir)
+        monkeypatch.setattr('dyc.walker.is_binary', lambda path: 1 / 0)
+        tmpdir.join('src', 'blob.tpl').remove()
+        assert list(walker.walk()) == [str(tmpdir.join('src', 'pkg', 'a.py'))]
+
+    def test_git_lists_tracked_and_untracked_files(self, tmpdir):
+        subprocess.check_call(['git', 'init', '-q', str(tmpdir)])
+        tmpdir.join('.gitignore').write('generated/\n')
+        tmpdir.join('generated', 'g.py').write('g = 1\n', ensure=True)
+        tmpdir.join('a.py').write('a = 1\n')
+        subprocess.check_call(['git', 'add', 'a.py'], cwd=str(tmpdir))
+        tmpdir.join('b.py').write('b = 1\n')
+        walker = FileWalker(str(tmpdir), extensions=['py'], discovery='git')
+        assert sorted(walker.files()) == [str(tmpdir.join('a.py')), str(tmpdir.join('b.py'))]
+
+    def test_git_falls_back_to_walking(self, tmpdir):
+        walker = self.tree(tmpdir)
+        walker.discovery = 'git'
+        assert list(walker.files()) == [str(tmpdir.join('src', 'pkg', 'a.py'))]